@@ -18,15 +18,48 @@ Consulta informações públicas de:
 """
 
 import requests
+import argparse
+import asyncio
+import csv
+import io
+import ipaddress
 import json
+import mmap
+import operator
+import os
+import random
 import re
+import socket
+import sqlite3
+import struct
 import sys
 import time
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import heapq
+import itertools
+import shutil
+import tempfile
+import threading
+import unicodedata
+import zipfile
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Any
-from datetime import datetime
+from typing import Optional, Dict, List, Any, Callable, Tuple, Iterable, Iterator, AsyncIterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Cores para terminal
 class Colors:
@@ -39,99 +72,1984 @@ class Colors:
     END = '\033[0m'
     BOLD = '\033[1m'
 
-def banner():
-    print(f"""{Colors.CYAN}
-    ╔═══════════════════════════════════════════════════════════════╗
-    ║  ██████╗ ███████╗██╗███╗   ██╗████████╗    ██████╗ ██████╗    ║
-    ║ ██╔═══██╗██╔════╝██║████╗  ██║╚══██╔══╝    ██╔══██╗██╔══██╗   ║
-    ║ ██║   ██║███████╗██║██╔██╗ ██║   ██║       ██████╔╝██████╔╝   ║
-    ║ ██║   ██║╚════██║██║██║╚██╗██║   ██║       ██╔══██╗██╔══██╗   ║
-    ║ ╚██████╔╝███████║██║██║ ╚████║   ██║       ██████╔╝██║  ██║   ║
-    ║  ╚═════╝ ╚══════╝╚═╝╚═╝  ╚═══╝   ╚═╝       ╚═════╝ ╚═╝  ╚═╝   ║
-    ╠═══════════════════════════════════════════════════════════════╣
-    ║              🎨 Desenvolvido por VanGogh Dev                  ║
-    ║         github.com/vangoghdev | OSINT Brasil v2.0             ║
-    ╚═══════════════════════════════════════════════════════════════╝
-    {Colors.END}""")
+def banner():
+    print(f"""{Colors.CYAN}
+    ╔═══════════════════════════════════════════════════════════════╗
+    ║  ██████╗ ███████╗██╗███╗   ██╗████████╗    ██████╗ ██████╗    ║
+    ║ ██╔═══██╗██╔════╝██║████╗  ██║╚══██╔══╝    ██╔══██╗██╔══██╗   ║
+    ║ ██║   ██║███████╗██║██╔██╗ ██║   ██║       ██████╔╝██████╔╝   ║
+    ║ ██║   ██║╚════██║██║██║╚██╗██║   ██║       ██╔══██╗██╔══██╗   ║
+    ║ ╚██████╔╝███████║██║██║ ╚████║   ██║       ██████╔╝██║  ██║   ║
+    ║  ╚═════╝ ╚══════╝╚═╝╚═╝  ╚═══╝   ╚═╝       ╚═════╝ ╚═╝  ╚═╝   ║
+    ╠═══════════════════════════════════════════════════════════════╣
+    ║              🎨 Desenvolvido por VanGogh Dev                  ║
+    ║         github.com/vangoghdev | OSINT Brasil v2.0             ║
+    ╚═══════════════════════════════════════════════════════════════╝
+    {Colors.END}""")
+
+
+class RateLimitExceeded(Exception):
+    """Não há cota disponível para o host dentro do tempo de espera permitido"""
+
+
+class TokenBucket:
+    """Balde de tokens: ``rate`` requisições por segundo com rajadas de até ``burst``"""
+    
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Reserva um token e retorna quanto tempo esperar até ele valer"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(delay, self.paused_until - now)
+    
+    def _refund(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+    
+    def reserve(self, max_wait: Optional[float] = None) -> float:
+        """Reserva um token sem bloquear; retorna a espera necessária (uso assíncrono)"""
+        delay = self._reserve()
+        if max_wait is not None and delay > max_wait:
+            self._refund()
+            raise RateLimitExceeded(f"Cota esgotada (próxima em {delay:.1f}s)")
+        return delay
+    
+    def acquire(self, max_wait: Optional[float] = None):
+        delay = self.reserve(max_wait)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def pause(self, seconds: float):
+        """Suspende o balde (ex.: Retry-After) e zera a rajada acumulada"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0)
+
+
+class AdaptiveLimit:
+    """Limite de concorrência AIMD: cresce +1 por janela de sucessos e cai pela metade em 429/503"""
+    
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+    
+    def acquire(self, max_wait: Optional[float] = None):
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise RateLimitExceeded("Limite de concorrência do host atingido")
+                self._cond.wait(remaining)
+            self.in_flight += 1
+    
+    def release(self, throttled: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+    
+    def resize(self, maximum: int):
+        with self._cond:
+            self.maximum = maximum
+            self.limit = min(self.limit, maximum)
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """Limites por host: balde de tokens configurável e concorrência adaptativa (AIMD)"""
+    
+    # host -> (requisições por segundo, rajada); hosts ausentes não têm limite de taxa
+    DEFAULT_LIMITS = {
+        "receitaws.com.br": (3 / 60, 3),
+        "publica.cnpj.ws": (3 / 60, 3),
+        "brasilapi.com.br": (10, 10),
+        "viacep.com.br": (5, 10),
+        "opencep.com": (5, 10),
+        "dns.google": (50, 100),
+    }
+    
+    # Status que indicam que o provedor está pedindo para reduzir o ritmo
+    THROTTLE_STATUS = (429, 503)
+    
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_concurrency: int = 5):
+        self.limits = dict(self.DEFAULT_LIMITS)
+        if limits:
+            self.limits.update(limits)
+        self.max_concurrency = max_concurrency
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._concurrency: Dict[str, AdaptiveLimit] = {}
+        # Hosts sem taxa configurada pausados por Retry-After: host -> até quando (monotonic)
+        self._pauses: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, host: str) -> Tuple[Optional[TokenBucket], AdaptiveLimit]:
+        with self._lock:
+            if host not in self._concurrency:
+                limit = self.limits.get(host)
+                self._buckets[host] = TokenBucket(*limit) if limit else None
+                self._concurrency[host] = AdaptiveLimit(self.max_concurrency)
+            return self._buckets[host], self._concurrency[host]
+    
+    def _pause_delay(self, host: str, max_wait: Optional[float] = None) -> float:
+        """Espera até o fim da pausa de um host sem taxa configurada (0 se não está pausado)"""
+        with self._lock:
+            delay = self._pauses.get(host, 0.0) - time.monotonic()
+            if delay <= 0:
+                self._pauses.pop(host, None)
+                return 0.0
+        if max_wait is not None and delay > max_wait:
+            raise RateLimitExceeded(f"Host pausado pelo Retry-After (próxima em {delay:.1f}s)")
+        return delay
+    
+    def acquire(self, host: str, max_wait: Optional[float] = None):
+        bucket, concurrency = self._state(host)
+        concurrency.acquire(max_wait)
+        try:
+            if bucket is not None:
+                bucket.acquire(max_wait)
+            else:
+                delay = self._pause_delay(host, max_wait)
+                if delay > 0:
+                    time.sleep(delay)
+        except RateLimitExceeded:
+            concurrency.release()
+            raise
+    
+    def reserve(self, host: str, max_wait: Optional[float] = None) -> float:
+        """Reserva cota do host sem bloquear e retorna a espera (sem limite de concorrência)"""
+        bucket, _ = self._state(host)
+        return bucket.reserve(max_wait) if bucket is not None else self._pause_delay(host, max_wait)
+    
+    def release(self, host: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        _, concurrency = self._state(host)
+        concurrency.release(status in self.THROTTLE_STATUS)
+        self.throttle(host, status, retry_after)
+    
+    def throttle(self, host: str, status: Optional[int], retry_after: Optional[float] = None):
+        """Aplica ao balde do host a resposta 429/503 (e o Retry-After, se houver)"""
+        if status not in self.THROTTLE_STATUS:
+            return
+        bucket, _ = self._state(host)
+        if bucket is not None:
+            bucket.pause(retry_after if retry_after is not None else 1 / bucket.rate)
+        elif retry_after:
+            # Host sem taxa configurada: só pausa até o Retry-After; a taxa não fica limitada depois
+            with self._lock:
+                self._pauses[host] = max(self._pauses.get(host, 0.0), time.monotonic() + retry_after)
+    
+    def set_limit(self, host: str, rate: float, burst: float):
+        """Define (ou troca) a taxa de um host, descartando o balde anterior"""
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self._buckets[host] = TokenBucket(rate, burst)
+            self._concurrency.setdefault(host, AdaptiveLimit(self.max_concurrency))
+    
+    def resize(self, max_concurrency: int):
+        with self._lock:
+            self.max_concurrency = max_concurrency
+            limits = list(self._concurrency.values())
+        for limit in limits:
+            limit.resize(max_concurrency)
+    
+    def status(self) -> Dict[str, Dict]:
+        with self._lock:
+            hosts = list(self._concurrency.items())
+            buckets = dict(self._buckets)
+        return {
+            host: {
+                "concurrency_limit": int(limit.limit),
+                "in_flight": limit.in_flight,
+                "rate": buckets[host].rate if buckets.get(host) else None,
+            }
+            for host, limit in hosts
+        }
+    
+    @staticmethod
+    def retry_after(resp: requests.Response) -> Optional[float]:
+        """Interpreta o cabeçalho Retry-After (segundos ou data HTTP)"""
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitOpenError(Exception):
+    """O circuit breaker do host está aberto; a requisição nem é enviada"""
+
+
+class ProviderHealth:
+    """Saúde de um provedor: EWMA de latência e de erros com circuit breaker
+    
+    O circuito abre após ``failure_threshold`` falhas seguidas ou quando a taxa de
+    erro (EWMA) passa de ``error_threshold``; depois de ``cooldown`` segundos fica
+    meio aberto e deixa passar uma única requisição de teste, que decide se fecha
+    ou reabre.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, alpha: float = 0.2, failure_threshold: int = 5,
+                 error_threshold: float = 0.5, min_requests: int = 10, cooldown: float = 30):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        
+        self.state = self.CLOSED
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+    
+    def release_probe(self):
+        """Devolve a vaga de sonda do circuito meio aberto sem registrar resultado"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+    
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probing = False
+    
+    def record(self, success: bool, latency: Optional[float] = None):
+        with self._lock:
+            self.requests += 1
+            self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+            if latency is not None:
+                if self.latency is None:
+                    self.latency = latency
+                else:
+                    self.latency += self.alpha * (latency - self.latency)
+            
+            if success:
+                self.consecutive_failures = 0
+                if self.state == self.HALF_OPEN:
+                    self.state = self.CLOSED
+                    self._probing = False
+                return
+            
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self._open()
+            elif (self.consecutive_failures >= self.failure_threshold
+                    or (self.requests >= self.min_requests and self.error_rate >= self.error_threshold)):
+                self._open()
+    
+    def rank(self, failure_cost: float) -> Tuple[int, float]:
+        """Chave de ordenação: circuito fechado primeiro, depois menor custo esperado
+        
+        O custo é a latência EWMA mais a taxa de erro vezes ``failure_cost`` (tipicamente
+        o timeout). Provedores sem medição custam zero e são experimentados primeiro.
+        """
+        order = {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[self.state]
+        return order, (self.latency or 0.0) + self.error_rate * failure_cost
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "latency_ewma": round(self.latency, 4) if self.latency is not None else None,
+                "error_rate_ewma": round(self.error_rate, 4),
+                "consecutive_failures": self.consecutive_failures,
+                "requests": self.requests,
+                "failures": self.failures,
+            }
+
+
+class TransportStats:
+    """Latência e saúde por host, compartilhadas pelos transportes síncrono e assíncrono"""
+    
+    def __init__(self):
+        self._latencies: Dict[str, deque] = {}
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+    
+    def _record_latency(self, host: str, elapsed: float):
+        samples = self._latencies.get(host)
+        if samples is None:
+            samples = self._latencies.setdefault(host, deque(maxlen=100))
+        samples.append(elapsed)
+    
+    def health_for(self, url: str) -> ProviderHealth:
+        """Estado de saúde do host da URL (criado na primeira consulta)"""
+        host = urlsplit(url).netloc
+        health = self._health.get(host)
+        if health is None:
+            with self._lock:
+                health = self._health.setdefault(host, ProviderHealth())
+        return health
+    
+    def health(self) -> Dict[str, Dict]:
+        """Saúde de todos os hosts já consultados (para dashboards)"""
+        with self._lock:
+            hosts = list(self._health.items())
+        return {host: health.snapshot() for host, health in hosts}
+    
+    def latency(self, url: str, percentile: float = 0.9) -> Optional[float]:
+        """Percentil de latência observado para o host da URL (None se desconhecido)"""
+        samples = sorted(self._latencies.get(urlsplit(url).netloc, ()))
+        if not samples:
+            return None
+        return samples[int(percentile * (len(samples) - 1))]
+
+
+class HTTPTransport(TransportStats):
+    """Transporte HTTP compartilhado com pool de conexões keep-alive por host"""
+    
+    USER_AGENT = 'OSINT-Brasil/2.0 (Educational Purpose)'
+    
+    # Um 429 com Retry-After até este valor (segundos) é repetido em vez de devolvido
+    MAX_RETRY_AFTER = 10
+    MAX_RETRIES = 2
+    
+    def __init__(self, pool_size: int = 5, timeout: float = 10,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.limiter = limiter
+        self._sessions: Dict[str, requests.Session] = {}
+    
+    def _adapter(self) -> HTTPAdapter:
+        return HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+    
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers['User-Agent'] = self.USER_AGENT
+                session.mount("https://", self._adapter())
+                session.mount("http://", self._adapter())
+                self._sessions[host] = session
+            return session
+    
+    def resize(self, pool_size: int):
+        """Aumenta o pool de cada host para acompanhar o número de workers"""
+        with self._lock:
+            if pool_size <= self.pool_size:
+                return
+            self.pool_size = pool_size
+            # Requisições em andamento mantêm o adapter antigo até terminarem
+            for session in self._sessions.values():
+                session.mount("https://", self._adapter())
+                session.mount("http://", self._adapter())
+        if self.limiter is not None:
+            self.limiter.resize(pool_size)
+    
+    def get(self, url: str, rate_wait: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET pelo pool do host; ``rate_wait`` limita a espera por cota (RateLimitExceeded)"""
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        
+        health = self.health_for(url)
+        for attempt in itertools.count():
+            # Provedor fora do ar: falha imediatamente em vez de esperar o timeout
+            if not health.allow():
+                raise CircuitOpenError(f"Circuito aberto para {host}")
+            
+            if self.limiter is not None:
+                try:
+                    self.limiter.acquire(host, rate_wait)
+                except RateLimitExceeded:
+                    # Sem cota não há requisição: libera uma eventual sonda do circuito
+                    health.release_probe()
+                    raise
+            
+            start = time.monotonic()
+            resp = None
+            retry_after = None
+            try:
+                resp = self._session(host).get(url, **kwargs)
+                retry_after = RateLimiter.retry_after(resp)
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release(host, resp.status_code if resp is not None else None, retry_after)
+                elapsed = time.monotonic() - start
+                # 429 é controle de ritmo, não falha do provedor
+                failed = resp is None or resp.status_code >= 500
+                health.record(not failed, None if failed or resp.status_code == 429 else elapsed)
+            
+            if resp.status_code < 500 and resp.status_code != 429:
+                self._record_latency(host, elapsed)
+            
+            # 429 com espera curta: o balde do host já foi pausado, então basta repetir
+            if (resp.status_code == 429 and self.limiter is not None and retry_after is not None
+                    and attempt < self.MAX_RETRIES and retry_after <= self.MAX_RETRY_AFTER
+                    and (rate_wait is None or retry_after <= rate_wait)):
+                continue
+            return resp
+    
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class AsyncHTTPTransport(TransportStats):
+    """Transporte HTTP assíncrono (aiohttp): milhares de conexões em um único event loop"""
+    
+    USER_AGENT = HTTPTransport.USER_AGENT
+    MAX_RETRY_AFTER = HTTPTransport.MAX_RETRY_AFTER
+    MAX_RETRIES = HTTPTransport.MAX_RETRIES
+    
+    def __init__(self, max_connections: int = 1000, per_host: int = 100, timeout: float = 10,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__()
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.limiter = limiter
+        self._client: Optional["aiohttp.ClientSession"] = None
+    
+    def _session(self) -> "aiohttp.ClientSession":
+        # Criada sob demanda: a sessão precisa pertencer ao event loop em execução, e sem
+        # aiohttp só falha quem de fato usa HTTP (a varredura com dns_server não usa)
+        if aiohttp is None:
+            raise ImportError("As consultas HTTP assíncronas requerem o pacote aiohttp (pip install aiohttp)")
+        if self._client is None or self._client.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host,
+                                             ttl_dns_cache=300)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': self.USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._client
+    
+    async def get_json(self, url: str, rate_wait: Optional[float] = None) -> Tuple[int, Optional[Any]]:
+        """GET que retorna (status, JSON); o JSON só é lido em respostas 200"""
+        host = urlsplit(url).netloc
+        session = self._session()
+        
+        health = self.health_for(url)
+        for attempt in itertools.count():
+            if not health.allow():
+                raise CircuitOpenError(f"Circuito aberto para {host}")
+            
+            # A concorrência por host fica a cargo do conector; aqui só a cota do balde
+            if self.limiter is not None:
+                try:
+                    delay = self.limiter.reserve(host, rate_wait)
+                except RateLimitExceeded:
+                    health.release_probe()
+                    raise
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            
+            start = time.monotonic()
+            status = None
+            data = None
+            retry_after = None
+            try:
+                async with session.get(url) as resp:
+                    status = resp.status
+                    retry_after = RateLimiter.retry_after(resp)
+                    if status == 200:
+                        data = await resp.json(content_type=None)
+            finally:
+                elapsed = time.monotonic() - start
+                failed = status is None or status >= 500
+                health.record(not failed, None if failed or status == 429 else elapsed)
+            
+            if self.limiter is not None:
+                self.limiter.throttle(host, status, retry_after)
+            if status < 500 and status != 429:
+                self._record_latency(host, elapsed)
+            
+            if (status == 429 and self.limiter is not None and retry_after is not None
+                    and attempt < self.MAX_RETRIES and retry_after <= self.MAX_RETRY_AFTER
+                    and (rate_wait is None or retry_after <= rate_wait)):
+                continue
+            return status, data
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class ResultCache:
+    """Cache persistente em SQLite (modo WAL) de resultados por (tipo, chave limpa)"""
+    
+    DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".osint_brasil", "cache.db")
+    
+    # TTL em segundos por tipo; None usa o TTL informado pela consulta (ex.: TTL do DNS)
+    DEFAULT_TTLS = {
+        "cnpj": 7 * 86400,
+        "cep": 30 * 86400,
+        "domain": None,
+        "email": None,
+    }
+    
+    def __init__(self, path: Optional[str] = None, ttls: Optional[Dict[str, Optional[int]]] = None):
+        self.path = path or self.DEFAULT_PATH
+        self.ttls = dict(self.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires REAL NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        conn.commit()
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Uma conexão por thread; o WAL permite leitores concorrentes com um escritor"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def get_with_expiry(self, kind: str, key: str) -> Optional[Tuple[Dict, float]]:
+        """Retorna (resultado, instante de expiração) de uma entrada válida"""
+        row = self._conn().execute(
+            "SELECT value, expires FROM results WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+    
+    def get(self, kind: str, key: str) -> Optional[Dict]:
+        entry = self.get_with_expiry(kind, key)
+        return entry[0] if entry is not None else None
+    
+    def peek(self, kind: str, key: str) -> Optional[Dict]:
+        """Consulta apenas o cache, sem carregar"""
+        return self.get(kind, key)
+    
+    @staticmethod
+    def cacheable(value: Dict) -> bool:
+        """Erros e resultados incompletos (tipos de registro que falharam) nunca vão para o cache"""
+        return "error" not in value and "failed" not in value
+    
+    def set(self, kind: str, key: str, value: Dict, ttl: Optional[float] = None):
+        """Grava o resultado pelo TTL do tipo (erros e resultados incompletos não são gravados)"""
+        if not self.cacheable(value):
+            return
+        configured = self.ttls.get(kind)
+        if configured is not None:
+            ttl = configured
+        if not ttl or ttl <= 0:
+            return
+        
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (kind, key, value, expires) VALUES (?, ?, ?, ?)",
+            (kind, key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+        )
+        conn.commit()
+    
+    def get_or_load(self, kind: str, key: str, loader: Callable[[], Tuple[Dict, Optional[float]]]) -> Dict:
+        """Retorna do cache ou executa loader() -> (resultado, ttl) e grava se não for erro"""
+        cached = self.get(kind, key)
+        if cached is not None:
+            return cached
+        
+        value, ttl = loader()
+        self.set(kind, key, value, ttl)
+        return value
+    
+    def items(self, kind: str):
+        """Gera (chave, resultado) das entradas válidas de um tipo"""
+        rows = self._conn().execute(
+            "SELECT key, value FROM results WHERE kind = ? AND expires > ?", (kind, time.time())
+        )
+        for key, value in rows:
+            yield key, json.loads(value)
+    
+    def purge(self) -> int:
+        """Remove entradas expiradas e retorna quantas foram apagadas"""
+        conn = self._conn()
+        cursor = conn.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+        conn.commit()
+        return cursor.rowcount
+    
+    def close(self):
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class MemoryCache:
+    """Cache LRU em memória limitado por entradas e bytes, com stale-while-revalidate"""
+    
+    # TTL em memória quando nem a configuração nem a consulta informam um
+    DEFAULT_TTL = 300
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 32 * 1024 * 1024,
+                 ttls: Optional[Dict[str, Optional[int]]] = None, stale_for: float = 3600,
+                 backend: Optional[ResultCache] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(ResultCache.DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.stale_for = stale_for
+        self.backend = backend
+        
+        # (tipo, chave) -> (valor, tamanho aproximado, fresco até)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+    
+    def _store(self, kind: str, key: str, value: Dict, ttl: Optional[float],
+               expires: Optional[float] = None):
+        """Grava na memória; ``expires`` (vindo do disco) limita o TTL à validade restante da entrada"""
+        configured = self.ttls.get(kind)
+        if configured is not None:
+            ttl = configured
+        if ttl is None:
+            ttl = self.DEFAULT_TTL
+        if expires is not None:
+            ttl = min(ttl, expires - time.time())
+        if ttl <= 0 or not ResultCache.cacheable(value):
+            return
+        
+        size = len(json.dumps(value, ensure_ascii=False))
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            old = self._entries.pop((kind, key), None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[(kind, key)] = (value, size, time.time() + ttl)
+            self._bytes += size
+            
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+    
+    def _from_backend(self, kind: str, key: str) -> Optional[Dict]:
+        """Lê do disco e aquece a memória só pelo tempo que a entrada ainda vale lá"""
+        if self.backend is None:
+            return None
+        entry = self.backend.get_with_expiry(kind, key)
+        if entry is None:
+            return None
+        value, expires = entry
+        self._store(kind, key, value, None, expires)
+        return value
+    
+    def _load(self, kind: str, key: str, loader: Callable[[], Tuple[Dict, Optional[float]]]) -> Dict:
+        value = self._from_backend(kind, key)
+        if value is not None:
+            return value
+        
+        value, ttl = loader()
+        if self.backend is not None:
+            self.backend.set(kind, key, value, ttl)
+        self._store(kind, key, value, ttl)
+        return value
+    
+    def _refresh(self, kind: str, key: str, loader: Callable[[], Tuple[Dict, Optional[float]]]):
+        try:
+            self._load(kind, key, loader)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard((kind, key))
+    
+    def get_or_load(self, kind: str, key: str, loader: Callable[[], Tuple[Dict, Optional[float]]]) -> Dict:
+        """Serve da memória; entradas vencidas são servidas enquanto uma única atualização roda em segundo plano"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                value, _, fresh_until = entry
+                if now < fresh_until:
+                    self._entries.move_to_end((kind, key))
+                    return value
+                
+                if now < fresh_until + self.stale_for:
+                    self._entries.move_to_end((kind, key))
+                    if (kind, key) not in self._refreshing:
+                        self._refreshing.add((kind, key))
+                        threading.Thread(target=self._refresh, args=(kind, key, loader),
+                                         daemon=True).start()
+                    return value
+        
+        return self._load(kind, key, loader)
+    
+    def get(self, kind: str, key: str) -> Optional[Dict]:
+        """Valor fresco da memória ou do disco, sem carregar nem servir entradas vencidas"""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and time.time() < entry[2]:
+                self._entries.move_to_end((kind, key))
+                return entry[0]
+        return self._from_backend(kind, key)
+    
+    def set(self, kind: str, key: str, value: Dict, ttl: Optional[float] = None):
+        """Grava na memória e no disco (erros e resultados incompletos não são gravados)"""
+        if not ResultCache.cacheable(value):
+            return
+        if self.backend is not None:
+            self.backend.set(kind, key, value, ttl)
+        self._store(kind, key, value, ttl)
+    
+    def peek(self, kind: str, key: str) -> Optional[Dict]:
+        """Consulta a memória (inclusive entradas vencidas ainda servíveis) e o disco, sem carregar"""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and time.time() < entry[2] + self.stale_for:
+                return entry[0]
+        if self.backend is not None:
+            return self.backend.peek(kind, key)
+        return None
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SingleFlight:
+    """Agrupa chamadas concorrentes com a mesma chave em uma única execução"""
+    
+    def __init__(self):
+        self._calls: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        
+        if not leader:
+            return call.result()
+        
+        try:
+            value = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """SingleFlight para corrotinas: consultas iguais em andamento aguardam a mesma tarefa"""
+    
+    def __init__(self):
+        self._calls: Dict[Any, "asyncio.Future"] = {}
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        call = self._calls.get(key)
+        if call is not None:
+            # shield: o cancelamento de um seguidor não cancela a consulta dos demais
+            return await asyncio.shield(call)
+        
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # Marca a exceção como recuperada mesmo sem seguidores aguardando
+            call.exception()
+            raise
+        else:
+            call.set_result(value)
+            return value
+        finally:
+            del self._calls[key]
+
+
+class CachedLookup:
+    """Base para módulos cujos resultados podem passar pelo cache"""
+    
+    cache = None
+    flight = None
+    
+    def _cached(self, kind: str, key: str, loader: Callable[[], Tuple[Dict, Optional[float]]]) -> Dict:
+        def run():
+            if self.cache is None:
+                return loader()[0]
+            return self.cache.get_or_load(kind, key, loader)
+        
+        # Consultas idênticas em andamento compartilham a mesma requisição
+        if self.flight is None:
+            return run()
+        return self.flight.do((kind, key), run)
+
+
+class AsyncCachedLookup:
+    """Versão assíncrona de CachedLookup: o loader é uma corrotina -> (resultado, ttl)"""
+    
+    cache = None
+    flight = None
+    
+    async def _cached(self, kind: str, key: str, loader: Callable[[], Any]) -> Dict:
+        async def run():
+            # Leituras do cache são locais (memória/SQLite) e rápidas o bastante para o loop
+            if self.cache is not None:
+                value = self.cache.get(kind, key)
+                if value is not None:
+                    return value
+            
+            value, ttl = await loader()
+            if self.cache is not None and ResultCache.cacheable(value):
+                self.cache.set(kind, key, value, ttl)
+            return value
+        
+        if self.flight is None:
+            return await run()
+        return await self.flight.do((kind, key), run)
+
+
+class ProviderLookup(CachedLookup):
+    """Base para consultas com múltiplos provedores: fallback sequencial ou corrida"""
+    
+    APIS: List[str] = []
+    PARAM = ""
+    NOT_FOUND = "Consulta sem resultado"
+    
+    # Atraso padrão do hedge enquanto não há latência observada
+    DEFAULT_HEDGE_DELAY = 1.0
+    
+    # Espera máxima por cota de um provedor antes de passar para o próximo
+    RATE_WAIT = 1.0
+    
+    def __init__(self, http: Optional[HTTPTransport] = None, race: bool = False,
+                 hedge_delay: Optional[float] = None, cache: Optional[Any] = None,
+                 flight: Optional[SingleFlight] = None):
+        self.http = http or HTTPTransport()
+        self.cache = cache
+        self.flight = flight
+        self.race = race
+        self.hedge_delay = hedge_delay
+        # Pool da corrida compartilhado entre consultas (criado no primeiro uso)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    def _race_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Cada consulta simultânea do transporte pode ter todos os provedores em voo
+                workers = max(1, len(self.APIS)) * max(1, getattr(self.http, "pool_size", 1))
+                self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                    thread_name_prefix=type(self).__name__)
+            return self._executor
+    
+    def close(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    
+    def _parse(self, data: Dict, key: str) -> Optional[Dict]:
+        """Converte a resposta do provedor; None indica resposta inválida"""
+        raise NotImplementedError
+    
+    def _fetch(self, api: str, key: str) -> Optional[Dict]:
+        try:
+            resp = self.http.get(api.format(**{self.PARAM: key}), rate_wait=self.RATE_WAIT)
+            if resp.status_code == 200:
+                return self._parse(resp.json(), key)
+        except Exception:
+            pass
+        return None
+    
+    def _fetch_any(self, key: str) -> Dict:
+        result = self._query(key)
+        if result is not None:
+            return result
+        
+        return {"error": self.NOT_FOUND}
+    
+    def _providers(self) -> List[str]:
+        """Provedores saudáveis primeiro, do mais rápido (EWMA) ao mais lento; circuitos abertos por último"""
+        return sorted(self.APIS, key=lambda api: self.http.health_for(api).rank(self.http.timeout))
+    
+    def _query(self, key: str) -> Optional[Dict]:
+        if self.race:
+            return self._race(key)
+        
+        for api in self._providers():
+            result = self._fetch(api, key)
+            if result is not None:
+                return result
+        return None
+    
+    def _race(self, key: str) -> Optional[Dict]:
+        """Consulta o provedor mais rápido e dispara hedges para os próximos após um atraso"""
+        providers = self._providers()
+        executor = self._race_executor()
+        pending = set()
+        last_api = None
+        finished = threading.Event()
+        
+        def fetch(api: str) -> Optional[Dict]:
+            # Hedge que só saiu da fila depois do vencedor não gasta cota do provedor
+            if finished.is_set():
+                return None
+            result = self._fetch(api, key)
+            # Marcado aqui, antes de o worker pegar o próximo item da fila
+            if result is not None:
+                finished.set()
+            return result
+        
+        def launch() -> bool:
+            nonlocal last_api
+            if not providers or finished.is_set():
+                return False
+            last_api = providers.pop(0)
+            pending.add(executor.submit(fetch, last_api))
+            return True
+        
+        try:
+            launch()
+            while pending:
+                delay = None
+                if providers:
+                    delay = self.hedge_delay
+                    if delay is None:
+                        delay = self.http.latency(last_api) or self.DEFAULT_HEDGE_DELAY
+                
+                done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    result = future.result()
+                    if result is not None:
+                        return result
+                
+                # Estouro do atraso (hedge) ou falha de um provedor: aciona o próximo
+                launch()
+        finally:
+            # Requisições ainda na fila são canceladas; as já enviadas terminam e são descartadas
+            finished.set()
+            for future in pending:
+                future.cancel()
+        
+        return None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("A validação em lote requer o pacote numpy (pip install numpy)")
+
+
+# Linhas processadas por vez na validação em lote (limita a memória dos temporários)
+BATCH_ROWS = 1 << 20
+
+
+def _digit_matrix(codes: Any, width: int) -> "np.ndarray":
+    """Matriz (n, width) de bytes ASCII a partir de bytes, array NumPy ou sequência de strings
+    
+    ``bytes`` podem ser códigos colados (largura fixa) ou um por linha terminados em \\n;
+    arrays inteiros são lidos como números com zeros à esquerda. Códigos com outro tamanho
+    nunca são truncados: a linha sai marcada como malformada.
+    """
+    if isinstance(codes, (bytes, bytearray, memoryview)):
+        raw = np.frombuffer(codes, dtype=np.uint8)
+        delimited = raw.size > width and raw[width] == 0x0A
+        if delimited or not (raw == 0x0A).any():
+            stride = width + 1 if delimited else width
+            if raw.size % stride:
+                # Último código sem o \\n final
+                raw = np.concatenate([raw, np.full(stride - raw.size % stride, 0x0A, np.uint8)])
+            rows = raw.reshape(-1, stride)
+            if not delimited or (rows[:, width] == 0x0A).all():
+                return rows[:, :width]
+        
+        # Linhas de tamanhos variados (ou \\r\\n): separa pelas quebras de linha, com limpeza
+        lines = bytes(codes).decode("ascii", "replace").split("\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        codes = np.array(lines, dtype=f"U{max(width + 1, max(map(len, lines), default=0))}")
+    
+    codes = np.asarray(codes)
+    if codes.ndim == 2:
+        if codes.shape[1] != width:
+            raise ValueError(f"Matriz com {codes.shape[1]} colunas, esperadas {width}")
+        return codes.astype(np.uint8, copy=False)
+    if codes.dtype.kind in "iu":
+        values = codes.astype(np.int64)
+        powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+        matrix = (values[:, None] // powers % 10 + 0x30).astype(np.uint8)
+        # Fora de [0, 10**width): mais dígitos que o documento (ou negativo)
+        matrix[(values < 0) | (values >= 10 ** width), 0] = 0xFF
+        return matrix
+    
+    if codes.dtype.kind == "U" and codes.dtype.itemsize // 4 > width:
+        # Entradas formatadas (pontos, traços, barras): limpeza item a item só neste caso
+        codes = np.array([re.sub(r'\D', '', code) for code in codes.tolist()])
+    
+    # Uma coluna a mais revela códigos longos demais, que seriam truncados em S{width}
+    wide = np.ascontiguousarray(codes.astype(f"S{width + 1}")).view(np.uint8).reshape(-1, width + 1)
+    matrix = wide[:, :width]
+    matrix[wide[:, width] != 0, 0] = 0xFF
+    return matrix
+
+
+def _digit_columns(matrix: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Transpõe a matriz ASCII em colunas de dígitos (uma linha por posição) e marca as bem formadas
+    
+    Colunas contíguas deixam as somas ponderadas em operações vetoriais simples; caracteres
+    que não são dígitos estouram o uint8 para acima de 9.
+    """
+    columns = np.ascontiguousarray((matrix - np.uint8(0x30)).T)
+    return columns, (columns <= 9).all(axis=0)
+
+
+def _check_digit_pair(columns: "np.ndarray", w1: List[int], w2: List[int]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Os dois dígitos verificadores módulo 11 (resto < 2 vira 0) de cada código
+    
+    O segundo usa o primeiro calculado, não o informado: ``w2`` tem um peso a mais que ``w1``.
+    """
+    def weighted(weights):
+        total = np.zeros(columns.shape[1], dtype=np.int16)
+        for column, weight in zip(columns, weights):
+            total += column.astype(np.int16) * np.int16(weight)
+        return total
+    
+    remainder = weighted(w1) % 11
+    d1 = np.where(remainder < 2, 0, 11 - remainder).astype(np.uint8)
+    remainder = (weighted(w2[:len(w1)]) + d1.astype(np.int16) * np.int16(w2[len(w1)])) % 11
+    d2 = np.where(remainder < 2, 0, 11 - remainder).astype(np.uint8)
+    return d1, d2
+
+
+class AsyncProviderLookup(AsyncCachedLookup):
+    """Fallback sequencial e corrida entre provedores sobre o AsyncHTTPTransport"""
+    
+    async def _fetch(self, api: str, key: str) -> Optional[Dict]:
+        try:
+            status, data = await self.http.get_json(api.format(**{self.PARAM: key}), rate_wait=self.RATE_WAIT)
+            if status == 200 and isinstance(data, dict):
+                return self._parse(data, key)
+        except ImportError:
+            raise
+        except Exception:
+            pass
+        return None
+    
+    async def _fetch_any(self, key: str) -> Tuple[Dict, Optional[float]]:
+        result = await self._query(key)
+        if result is not None:
+            return result, None
+        
+        return {"error": self.NOT_FOUND}, None
+    
+    async def _query(self, key: str) -> Optional[Dict]:
+        if self.race:
+            return await self._race(key)
+        
+        for api in self._providers():
+            result = await self._fetch(api, key)
+            if result is not None:
+                return result
+        return None
+    
+    async def _race(self, key: str) -> Optional[Dict]:
+        """Como ProviderLookup._race, mas os perdedores são cancelados em vez de abandonados"""
+        providers = self._providers()
+        pending = set()
+        last_api = None
+        
+        def launch():
+            nonlocal last_api
+            if providers:
+                last_api = providers.pop(0)
+                pending.add(asyncio.ensure_future(self._fetch(last_api, key)))
+        
+        try:
+            launch()
+            while pending:
+                delay = None
+                if providers:
+                    delay = self.hedge_delay
+                    if delay is None:
+                        delay = self.http.latency(last_api) or self.DEFAULT_HEDGE_DELAY
+                
+                done, pending = await asyncio.wait(pending, timeout=delay,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        return result
+                
+                launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return None
+
+
+class CNPJLookup(ProviderLookup):
+    """Consulta CNPJ via APIs públicas oficiais"""
+    
+    APIS = [
+        "https://receitaws.com.br/v1/cnpj/{cnpj}",
+        "https://brasilapi.com.br/api/cnpj/v1/{cnpj}",
+        "https://publica.cnpj.ws/cnpj/{cnpj}"
+    ]
+    PARAM = "cnpj"
+    NOT_FOUND = "Não foi possível consultar o CNPJ"
+    
+    WEIGHTS_1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    WEIGHTS_2 = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    
+    def __init__(self, http: Optional[HTTPTransport] = None, base: Optional["CNPJBase"] = None, **kwargs):
+        super().__init__(http, **kwargs)
+        # Com uma base offline, as consultas são respondidas localmente, sem rede
+        self.base = base
+    
+    @staticmethod
+    def clean(cnpj: str) -> str:
+        return re.sub(r'\D', '', cnpj)
+    
+    @staticmethod
+    def check_digits(cnpj: str) -> str:
+        """Calcula os dois dígitos verificadores a partir dos 12 primeiros dígitos"""
+        digits = [ord(c) - 48 for c in cnpj[:12]]
+        
+        remainder = sum(map(operator.mul, digits, CNPJLookup.WEIGHTS_1)) % 11
+        d1 = 0 if remainder < 2 else 11 - remainder
+        remainder = (sum(map(operator.mul, digits, CNPJLookup.WEIGHTS_2)) + d1 * 2) % 11
+        d2 = 0 if remainder < 2 else 11 - remainder
+        
+        return f"{d1}{d2}"
+    
+    @staticmethod
+    def validate(cnpj: str) -> bool:
+        return CNPJLookup.is_valid(CNPJLookup.clean(cnpj))
+    
+    @staticmethod
+    def is_valid(cnpj: str) -> bool:
+        """Valida um CNPJ já limpo (só dígitos)"""
+        if len(cnpj) != 14 or cnpj == cnpj[0] * 14:
+            return False
+        
+        return cnpj[-2:] == CNPJLookup.check_digits(cnpj)
+    
+    @staticmethod
+    def validate_batch(cnpjs: Any) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Valida milhões de CNPJs de uma vez (requer numpy)
+        
+        Aceita as mesmas entradas que CPFValidator.validate_batch, com 14 dígitos. Retorna a
+        máscara de válidos e a matriz n x 2 dos dígitos verificadores calculados a partir dos
+        12 primeiros (255 nas entradas malformadas).
+        """
+        _require_numpy()
+        matrix = _digit_matrix(cnpjs, 14)
+        valid = np.zeros(len(matrix), dtype=bool)
+        check = np.full((len(matrix), 2), 255, dtype=np.uint8)
+        
+        for start in range(0, len(matrix), BATCH_ROWS):
+            columns, well_formed = _digit_columns(matrix[start:start + BATCH_ROWS])
+            d1, d2 = _check_digit_pair(columns, CNPJLookup.WEIGHTS_1, CNPJLookup.WEIGHTS_2)
+            
+            repeated = (columns == columns[0]).all(axis=0)
+            valid[start:start + BATCH_ROWS] = (well_formed & ~repeated
+                                                & (columns[12] == d1) & (columns[13] == d2))
+            check[start:start + BATCH_ROWS, 0] = np.where(well_formed, d1, 255)
+            check[start:start + BATCH_ROWS, 1] = np.where(well_formed, d2, 255)
+        
+        return valid, check
+    
+    def _offline(self, cnpj: str) -> Optional[Dict]:
+        """Responde o que dispensa rede (inválido ou base offline)"""
+        if not self.is_valid(cnpj):
+            return {"error": "CNPJ inválido"}
+        
+        if self.base is not None:
+            data = self.base.get(cnpj)
+            if data is None:
+                return {"error": "CNPJ não encontrado na base offline"}
+            return self._normalize(data)
+        
+        return None
+    
+    def lookup(self, cnpj: str) -> Optional[Dict]:
+        return self.lookup_key(self.clean(cnpj))
+    
+    def lookup_key(self, cnpj: str) -> Optional[Dict]:
+        """Consulta um CNPJ já limpo (só dígitos), sem repetir a limpeza"""
+        local = self._offline(cnpj)
+        if local is not None:
+            return local
+        
+        return self._cached("cnpj", cnpj, lambda: (self._fetch_any(cnpj), None))
+    
+    def _parse(self, data: Dict, key: str) -> Optional[Dict]:
+        return self._normalize(data)
+    
+    def _normalize(self, data: Dict) -> Dict:
+        """Normaliza resposta de diferentes APIs"""
+        return {
+            "cnpj": data.get("cnpj", data.get("estabelecimento", {}).get("cnpj", "")),
+            "razao_social": data.get("nome", data.get("razao_social", "")),
+            "nome_fantasia": data.get("fantasia", data.get("nome_fantasia", "")),
+            "situacao": data.get("situacao", data.get("descricao_situacao_cadastral", "")),
+            "data_abertura": data.get("abertura", data.get("data_inicio_atividade", "")),
+            "cnae_principal": data.get("atividade_principal", [{}])[0].get("text", "") if isinstance(data.get("atividade_principal"), list) else data.get("cnae_fiscal_descricao", ""),
+            "endereco": {
+                "logradouro": data.get("logradouro", ""),
+                "numero": data.get("numero", ""),
+                "bairro": data.get("bairro", ""),
+                "cidade": data.get("municipio", ""),
+                "uf": data.get("uf", ""),
+                "cep": data.get("cep", "")
+            },
+            "telefone": data.get("telefone", ""),
+            "email": data.get("email", ""),
+            "capital_social": data.get("capital_social", ""),
+            "socios": data.get("qsa", [])
+        }
+
+
+class AsyncCNPJLookup(AsyncProviderLookup, CNPJLookup):
+    """CNPJLookup assíncrono (requer AsyncHTTPTransport)"""
+    
+    async def lookup(self, cnpj: str) -> Optional[Dict]:
+        return await self.lookup_key(self.clean(cnpj))
+    
+    async def lookup_key(self, cnpj: str) -> Optional[Dict]:
+        local = self._offline(cnpj)
+        if local is not None:
+            return local
+        
+        return await self._cached("cnpj", cnpj, lambda: self._fetch_any(cnpj))
+
+
+class SortedTable:
+    """Tabela somente leitura: índice ordenado de largura fixa (chave + offset) sobre mmap
+    
+    O arquivo ``<nome>.idx`` guarda registros de ``key_len + 12`` bytes (chave ASCII,
+    offset uint64 e tamanho uint32) ordenados pela chave; ``<nome>.dat`` guarda os
+    valores. A busca é binária, O(log n), sem carregar nada em memória.
+    """
+    
+    ENTRY = struct.Struct("<QI")
+    
+    def __init__(self, path: str, key_len: int, with_values: bool = True):
+        self.key_len = key_len
+        # Sem valores o índice é apenas uma lista ordenada de chaves (sem .dat)
+        self.record_len = key_len + (self.ENTRY.size if with_values else 0)
+        self._idx_file = open(path + ".idx", "rb")
+        self._dat_file = open(path + ".dat", "rb") if with_values else None
+        self._idx = self._map(self._idx_file)
+        self._dat = self._map(self._dat_file) if with_values else b""
+        self.count = len(self._idx) // self.record_len
+    
+    @staticmethod
+    def _map(f) -> Any:
+        # mmap não aceita arquivos vazios
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def _key_at(self, i: int) -> bytes:
+        start = i * self.record_len
+        return self._idx[start:start + self.key_len]
+    
+    def _bisect(self, key: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _value_at(self, i: int) -> bytes:
+        start = i * self.record_len + self.key_len
+        offset, length = self.ENTRY.unpack_from(self._idx, start)
+        return self._dat[offset:offset + length]
+    
+    def get(self, key: str) -> Optional[bytes]:
+        raw = key.encode("ascii")
+        i = self._bisect(raw)
+        if i < self.count and self._key_at(i) == raw:
+            return self._value_at(i)
+        return None
+    
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Intervalo [início, fim) das chaves que começam com o prefixo, em O(log n)"""
+        raw = prefix.encode("ascii")
+        # Chaves são ASCII, então prefixo + 0x7f limita todas as que começam com ele
+        return self._bisect(raw), self._bisect(raw + b"\x7f")
+    
+    def keys(self, start: int = 0, stop: Optional[int] = None):
+        stop = self.count if stop is None else stop
+        for i in range(start, stop):
+            yield self._key_at(i).decode("ascii")
+    
+    def items(self):
+        for i in range(self.count):
+            yield self._key_at(i).decode("ascii"), self._value_at(i)
+    
+    def close(self):
+        for m in (self._idx, self._dat):
+            if isinstance(m, mmap.mmap):
+                m.close()
+        self._idx_file.close()
+        if self._dat_file is not None:
+            self._dat_file.close()
+
+
+class CNPJBase:
+    """Base offline de CNPJ construída a partir dos dados abertos da Receita Federal"""
+    
+    # Separadores usados nos arquivos .dat (campos e linhas de um mesmo registro)
+    FIELD_SEP = "\x1f"
+    ROW_SEP = "\x1e"
+    
+    # Tabelas: nome -> tamanho da chave (CNPJ completo ou CNPJ básico)
+    TABLES = {
+        "estabelecimentos": 14,
+        "empresas": 8,
+        "socios": 8,
+        "simples": 8,
+    }
+    
+    SITUACOES = {
+        "01": "NULA",
+        "02": "ATIVA",
+        "03": "SUSPENSA",
+        "04": "INAPTA",
+        "08": "BAIXADA",
+    }
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.tables: Dict[str, SortedTable] = {}
+        for name, key_len in self.TABLES.items():
+            if os.path.exists(os.path.join(path, name + ".idx")):
+                self.tables[name] = SortedTable(os.path.join(path, name), key_len)
+        
+        if "estabelecimentos" not in self.tables:
+            raise FileNotFoundError(f"Base CNPJ não encontrada em {path}")
+        
+        meta_path = os.path.join(path, "meta.json")
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        self.municipios = self.meta.get("municipios", {})
+        self.cnaes = self.meta.get("cnaes", {})
+    
+    def __len__(self) -> int:
+        return len(self.tables["estabelecimentos"])
+    
+    def matriz(self, basico: str) -> Optional[str]:
+        """CNPJ da matriz (identificador 1) de um CNPJ básico; sem matriz na base, o primeiro estabelecimento"""
+        table = self.tables["estabelecimentos"]
+        start, stop = table.prefix_range(basico)
+        for i in range(start, stop):
+            # Primeiro campo do estabelecimento: 1 = matriz, 2 = filial
+            if table._value_at(i).split(self.FIELD_SEP.encode(), 1)[0] == b"1":
+                return table._key_at(i).decode("ascii")
+        return table._key_at(start).decode("ascii") if start < stop else None
+    
+    def _rows(self, table: str, key: str) -> List[List[str]]:
+        if table not in self.tables:
+            return []
+        raw = self.tables[table].get(key)
+        if raw is None:
+            return []
+        return [row.split(self.FIELD_SEP) for row in raw.decode("utf-8").split(self.ROW_SEP)]
+    
+    @staticmethod
+    def _date(value: str) -> str:
+        if len(value) == 8 and value.isdigit() and value != "00000000":
+            return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+        return ""
+    
+    @staticmethod
+    def _number(value: str) -> Any:
+        try:
+            return float(value.replace(",", "."))
+        except ValueError:
+            return value
+    
+    def get(self, cnpj: str) -> Optional[Dict]:
+        """Retorna os dados do CNPJ no formato da BrasilAPI (aceito por CNPJLookup._normalize)"""
+        rows = self._rows("estabelecimentos", cnpj)
+        if not rows:
+            return None
+        
+        est = rows[0] + [""] * (27 - len(rows[0]))
+        basico = cnpj[:8]
+        
+        empresa = self._rows("empresas", basico)
+        empresa = empresa[0] + [""] * (6 - len(empresa[0])) if empresa else [""] * 6
+        
+        simples = self._rows("simples", basico)
+        simples = simples[0] + [""] * (6 - len(simples[0])) if simples else [""] * 6
+        
+        telefone = f"({est[18]}) {est[19]}" if est[19] else ""
+        
+        return {
+            "cnpj": cnpj,
+            "identificador_matriz_filial": est[0],
+            "razao_social": empresa[0],
+            "nome_fantasia": est[1],
+            "situacao_cadastral": est[2],
+            "descricao_situacao_cadastral": self.SITUACOES.get(est[2], est[2]),
+            "data_situacao_cadastral": self._date(est[3]),
+            "data_inicio_atividade": self._date(est[7]),
+            "cnae_fiscal": est[8],
+            "cnae_fiscal_descricao": self.cnaes.get(est[8], ""),
+            "cnaes_secundarios": [c for c in est[9].split(",") if c],
+            "logradouro": f"{est[10]} {est[11]}".strip(),
+            "numero": est[12],
+            "complemento": est[13],
+            "bairro": est[14],
+            "cep": est[15],
+            "uf": est[16],
+            "codigo_municipio": est[17],
+            "municipio": self.municipios.get(est[17], est[17]),
+            "telefone": telefone,
+            "email": est[24].lower(),
+            "natureza_juridica": empresa[1],
+            "capital_social": self._number(empresa[3]) if empresa[3] else "",
+            "porte": empresa[4],
+            "opcao_pelo_simples": simples[0] == "S" if simples[0] else None,
+            "opcao_pelo_mei": simples[3] == "S" if simples[3] else None,
+            "qsa": [
+                {
+                    "identificador_de_socio": row[0],
+                    "nome_socio": row[1],
+                    "cnpj_cpf_do_socio": row[2],
+                    "qualificacao_socio": row[3],
+                    "data_entrada_sociedade": self._date(row[4]),
+                }
+                for row in (r + [""] * (10 - len(r)) for r in self._rows("socios", basico))
+            ],
+        }
+    
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+
+
+def _cnpj_sort_run(kind: str, key_len: int, chunk: bytes, path: str) -> int:
+    """Worker de importação: interpreta um bloco de CSV, ordena pela chave e grava um run"""
+    records = []
+    text = io.StringIO(chunk.decode("latin-1"), newline="")
+    for row in csv.reader(text, delimiter=";", quotechar='"'):
+        if len(row) < 3:
+            continue
+        key, fields = CNPJBaseBuilder._key(kind, row)
+        if len(key) != key_len:
+            continue
+        fields = [f.replace("\n", " ").replace("\r", " ") for f in fields]
+        records.append((key, CNPJBase.FIELD_SEP.join(fields)))
+    
+    # Ordenação estável: sócios de uma mesma empresa mantêm a ordem do arquivo
+    records.sort(key=lambda r: r[0])
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for key, row in records:
+            f.write(key + CNPJBase.FIELD_SEP + row + "\n")
+    return len(records)
+
+
+class CNPJBaseBuilder:
+    """Importa os CSVs de dados abertos do CNPJ (Receita Federal) para o formato do CNPJBase
+    
+    Aceita diretórios, arquivos ZIP ou CSVs soltos. O tipo de cada arquivo é reconhecido
+    pelo nome usado pela Receita (EMPRECSV, ESTABELE, SOCIOCSV, SIMPLES, MUNICCSV, CNAECSV).
+    
+    A importação é em streaming: os arquivos são descompactados e lidos em blocos, cada
+    bloco é ordenado em um processo separado e gravado como um run temporário, e os runs
+    são intercalados (merge externo) na gravação final. O uso de memória fica limitado
+    (aproximadamente) por ``memory_limit``, independente do tamanho dos dumps.
+    """
+    
+    KINDS = {
+        "ESTABELE": "estabelecimentos",
+        "EMPRE": "empresas",
+        "SOCIO": "socios",
+        "SIMPLES": "simples",
+        "MUNIC": "municipios",
+        "CNAE": "cnaes",
+    }
+    
+    # Quantos runs são abertos ao mesmo tempo em cada passada do merge
+    MERGE_FAN_IN = 64
+    
+    # Fator estimado entre o tamanho do bloco em bytes e a memória para interpretá-lo
+    PARSE_OVERHEAD = 8
+    
+    def __init__(self, output: str, memory_limit: int = 1024 * 1024 * 1024,
+                 workers: Optional[int] = None):
+        self.output = output
+        self.memory_limit = memory_limit
+        self.workers = workers or os.cpu_count() or 1
+        # Cada worker e o processo principal seguram no máximo um bloco
+        self.chunk_size = max(1024 * 1024, memory_limit // ((self.workers + 2) * self.PARSE_OVERHEAD))
+    
+    @classmethod
+    def _kind(cls, name: str) -> Optional[str]:
+        name = os.path.basename(name).upper()
+        for marker, kind in cls.KINDS.items():
+            if marker in name:
+                return kind
+        return None
+    
+    @staticmethod
+    def _iter_files(paths: List[str]):
+        """Gera (nome, abridor de stream binário) para cada CSV nos caminhos informados"""
+        for path in paths:
+            if os.path.isdir(path):
+                yield from CNPJBaseBuilder._iter_files(
+                    [os.path.join(path, name) for name in sorted(os.listdir(path))]
+                )
+            elif zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as zf:
+                    for info in zf.infolist():
+                        if not info.is_dir():
+                            yield info.filename, lambda zf=zf, info=info: zf.open(info)
+            else:
+                yield path, lambda path=path: open(path, "rb")
+    
+    @staticmethod
+    def _record_end(data: bytes) -> int:
+        """Posição após a última quebra de linha fora de aspas (0 se não houver)
+        
+        O bloco começa no início de um registro, então uma quebra de linha está fora de
+        aspas quando o número de aspas antes dela é par (aspas escapadas "" contam duas).
+        """
+        quotes = data.count(b'"')
+        end = len(data)
+        cut = data.rfind(b"\n")
+        while cut >= 0:
+            quotes -= data.count(b'"', cut, end)
+            if quotes % 2 == 0:
+                return cut + 1
+            end = cut
+            cut = data.rfind(b"\n", 0, cut)
+        return 0
+    
+    def _chunks(self, stream):
+        """Lê o stream em blocos de ~chunk_size terminados em fim de registro"""
+        rest = b""
+        while True:
+            data = stream.read(self.chunk_size)
+            if not data:
+                break
+            data = rest + data
+            # Campos entre aspas podem conter quebras de linha: só corta entre registros
+            cut = self._record_end(data)
+            if cut == 0:
+                rest = data
+                continue
+            rest = data[cut:]
+            yield data[:cut]
+        if rest.strip():
+            yield rest
+    
+    @staticmethod
+    def _key(kind: str, row: List[str]) -> Tuple[str, List[str]]:
+        if kind == "estabelecimentos":
+            return row[0] + row[1] + row[2], row[3:]
+        return row[0], row[1:]
+    
+    @staticmethod
+    def _read_run(path: str, key_len: int):
+        with open(path, encoding="utf-8", newline="\n") as f:
+            for line in f:
+                yield line[:key_len], line[key_len + 1:-1]
+    
+    @classmethod
+    def _merge(cls, paths: List[str], key_len: int, tmp: str):
+        """Merge externo estável dos runs, em passadas de até MERGE_FAN_IN arquivos"""
+        generation = 0
+        while len(paths) > cls.MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(paths), cls.MERGE_FAN_IN):
+                group = paths[start:start + cls.MERGE_FAN_IN]
+                path = os.path.join(tmp, f"merge-{generation}-{start}.run")
+                with open(path, "w", encoding="utf-8", newline="\n") as f:
+                    runs = [cls._read_run(p, key_len) for p in group]
+                    for key, row in heapq.merge(*runs, key=lambda r: r[0]):
+                        f.write(key + CNPJBase.FIELD_SEP + row + "\n")
+                for p in group:
+                    os.remove(p)
+                merged.append(path)
+            paths = merged
+            generation += 1
+        
+        runs = [cls._read_run(p, key_len) for p in paths]
+        yield from heapq.merge(*runs, key=lambda r: r[0])
+    
+    def _write_table(self, name: str, records) -> int:
+        """Grava registros (chave, linha) já ordenados; chaves repetidas viram um só registro"""
+        count = 0
+        base = os.path.join(self.output, name)
+        with open(base + ".idx", "wb") as idx, open(base + ".dat", "wb") as dat:
+            offset = 0
+            current = None
+            rows: List[str] = []
+            
+            def flush():
+                nonlocal offset, count
+                value = CNPJBase.ROW_SEP.join(rows).encode("utf-8")
+                idx.write(current.encode("ascii") + SortedTable.ENTRY.pack(offset, len(value)))
+                dat.write(value)
+                offset += len(value)
+                count += 1
+            
+            for key, row in records:
+                if key != current:
+                    if current is not None:
+                        flush()
+                    current = key
+                    rows = []
+                rows.append(row)
+            if current is not None:
+                flush()
+        return count
+    
+    def build(self, sources: List[str]) -> Dict[str, int]:
+        """Importa as fontes e grava o índice; retorna a quantidade de registros por tabela"""
+        os.makedirs(self.output, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".runs-", dir=self.output)
+        runs: Dict[str, List[str]] = {name: [] for name in CNPJBase.TABLES}
+        meta: Dict[str, Dict[str, str]] = {"municipios": {}, "cnaes": {}}
+        
+        executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        pending = set()
+        try:
+            for name, opener in self._iter_files(sources):
+                kind = self._kind(name)
+                if kind is None:
+                    continue
+                
+                # Tabelas auxiliares são pequenas e ficam no meta.json
+                if kind in meta:
+                    with opener() as stream:
+                        text = io.TextIOWrapper(stream, encoding="latin-1", newline="")
+                        for row in csv.reader(text, delimiter=";", quotechar='"'):
+                            if len(row) >= 2:
+                                meta[kind][row[0]] = row[1]
+                    continue
+                
+                key_len = CNPJBase.TABLES[kind]
+                with opener() as stream:
+                    for chunk in self._chunks(stream):
+                        # A ordem dos runs segue a do arquivo, o que mantém o merge estável
+                        path = os.path.join(tmp, f"{kind}-{len(runs[kind]):06d}.run")
+                        runs[kind].append(path)
+                        if executor is None:
+                            _cnpj_sort_run(kind, key_len, chunk, path)
+                            continue
+                        
+                        # Contrapressão: no máximo um bloco em processamento por worker
+                        if len(pending) >= self.workers:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                future.result()
+                        pending.add(executor.submit(_cnpj_sort_run, kind, key_len, chunk, path))
+            
+            for future in pending:
+                future.result()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        try:
+            counts = {}
+            for name, key_len in CNPJBase.TABLES.items():
+                counts[name] = self._write_table(name, self._merge(runs[name], key_len, tmp))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        
+        with open(os.path.join(self.output, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        
+        # Índice reverso de sócios (nome/documento -> CNPJ da matriz)
+        base = CNPJBase(self.output)
+        try:
+            counts["socios_index"] = SocioIndex.build(
+                os.path.join(self.output, SocioIndex.FILENAME),
+                SocioIndex.partners_from_base(base),
+                memory_limit=self.memory_limit
+            )
+        finally:
+            base.close()
+        
+        return counts
 
 
-class CNPJLookup:
-    """Consulta CNPJ via APIs públicas oficiais"""
+class SocioIndex:
+    """Índice reverso de sócios (QSA): nome ou fragmento de CPF/CNPJ -> CNPJs
     
-    APIS = [
-        "https://receitaws.com.br/v1/cnpj/{cnpj}",
-        "https://brasilapi.com.br/api/cnpj/v1/{cnpj}",
-        "https://publica.cnpj.ws/cnpj/{cnpj}"
-    ]
+    Cada registro é ``termo (TERM_LEN bytes) + CNPJ (14 bytes)``, ordenado, sobre um
+    SortedTable sem valores. Termos são as palavras do nome sem acentos, ``#`` + os seis
+    dígitos visíveis do CPF mascarado ou ``$`` + CNPJ do sócio pessoa jurídica. A busca
+    por prefixo é um par de buscas binárias seguido de uma varredura do intervalo.
+    """
+    
+    FILENAME = "socios_index"
+    TERM_LEN = 24
+    KEY_LEN = TERM_LEN + 14
+    STOPWORDS = {"DA", "DE", "DO", "DAS", "DOS", "E"}
+    
+    # Termos adicionais com até esta quantidade de registros são interseccionados no índice;
+    # acima disso a filtragem fica para a conferência do QSA
+    INTERSECT_LIMIT = 200000
+    
+    def __init__(self, path: str):
+        if path.endswith(".idx"):
+            path = path[:-4]
+        self.path = path
+        self.table = SortedTable(path, self.KEY_LEN, with_values=False)
+    
+    def __len__(self) -> int:
+        return len(self.table)
     
     @staticmethod
-    def clean(cnpj: str) -> str:
-        return re.sub(r'\D', '', cnpj)
+    def normalize(text: str) -> str:
+        """Maiúsculas, sem acentos e apenas letras/dígitos separados por espaço"""
+        text = unicodedata.normalize("NFKD", text or "")
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        return re.sub(r'[^A-Z0-9]+', ' ', text.upper()).strip()
+    
+    @classmethod
+    def tokens(cls, name: str) -> List[str]:
+        return [t[:cls.TERM_LEN] for t in cls.normalize(name).split()
+                if len(t) > 1 and t not in cls.STOPWORDS]
     
     @staticmethod
-    def validate(cnpj: str) -> bool:
-        cnpj = CNPJLookup.clean(cnpj)
-        if len(cnpj) != 14 or cnpj == cnpj[0] * 14:
-            return False
+    def doc_term(document: str) -> Optional[str]:
+        digits = re.sub(r'\D', '', document or "")
+        if len(digits) == 14:
+            return "$" + digits
+        # CPF completo: a Receita publica apenas os dígitos 4 a 9
+        if len(digits) == 11:
+            digits = digits[3:9]
+        if len(digits) == 6:
+            return "#" + digits
+        return None
+    
+    @classmethod
+    def terms(cls, name: str, document: str) -> List[str]:
+        terms = cls.tokens(name)
+        doc = cls.doc_term(document)
+        if doc:
+            terms.append(doc)
+        return terms
+    
+    @classmethod
+    def matches(cls, query: str, name: str, document: str) -> bool:
+        """Confere se um sócio corresponde à consulta (mesmas regras da busca no índice)"""
+        if not re.search(r'[A-Za-z]', query):
+            doc = cls.doc_term(query)
+            return doc is not None and doc == cls.doc_term(document)
         
-        def calc_digit(cnpj, weights):
-            total = sum(int(cnpj[i]) * weights[i] for i in range(len(weights)))
-            remainder = total % 11
-            return '0' if remainder < 2 else str(11 - remainder)
+        name_tokens = cls.tokens(name)
+        return all(any(t.startswith(q) for t in name_tokens) for q in cls.tokens(query))
+    
+    @staticmethod
+    def partner_fields(socio: Dict) -> Tuple[str, str, str]:
+        """(nome, documento, qualificação) de um item de QSA em qualquer formato de API"""
+        return (
+            socio.get("nome_socio") or socio.get("nome") or "",
+            socio.get("cnpj_cpf_do_socio") or socio.get("cpf_cnpj_socio") or "",
+            socio.get("qualificacao_socio") or socio.get("qual") or "",
+        )
+    
+    @staticmethod
+    def partners_from_base(base: CNPJBase):
+        """Gera (CNPJ da matriz, nome, documento) a partir da tabela de sócios da base offline"""
+        table = base.tables.get("socios")
+        if table is None:
+            return
+        for basico, raw in table.items():
+            # A matriz nem sempre é a /0001: vem do estabelecimento marcado como matriz
+            cnpj = base.matriz(basico)
+            if cnpj is None:
+                continue
+            for row in raw.decode("utf-8").split(CNPJBase.ROW_SEP):
+                fields = row.split(CNPJBase.FIELD_SEP)
+                if len(fields) >= 3:
+                    yield cnpj, fields[1], fields[2]
+    
+    @classmethod
+    def partners_from_cache(cls, cache: ResultCache):
+        """Gera (CNPJ, nome, documento) a partir dos resultados de CNPJ acumulados no cache"""
+        for cnpj, result in cache.items("cnpj"):
+            for socio in result.get("socios") or []:
+                if isinstance(socio, dict):
+                    name, document, _ = cls.partner_fields(socio)
+                    yield cnpj, name, document
+    
+    @classmethod
+    def build(cls, path: str, partners, memory_limit: int = 256 * 1024 * 1024) -> int:
+        """Grava o índice a partir de (CNPJ, nome, documento) com ordenação externa"""
+        if path.endswith(".idx"):
+            path = path[:-4]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".runs-", dir=directory)
         
-        w1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-        w2 = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+        # Cada chave ocupa ~100 bytes como str do Python dentro de uma lista
+        chunk_items = max(10000, memory_limit // 100)
+        runs: List[str] = []
+        chunk: List[str] = []
         
-        d1 = calc_digit(cnpj, w1)
-        d2 = calc_digit(cnpj + d1, w2)
+        def flush():
+            chunk.sort()
+            run = os.path.join(tmp, f"socios-{len(runs):06d}.run")
+            with open(run, "w", encoding="ascii", newline="\n") as f:
+                f.writelines(key + "\n" for key in chunk)
+            runs.append(run)
+            chunk.clear()
         
-        return cnpj[-2:] == d1 + d2
+        count = 0
+        try:
+            for cnpj, name, document in partners:
+                if len(cnpj) != 14:
+                    continue
+                for term in cls.terms(name, document):
+                    chunk.append(term.ljust(cls.TERM_LEN) + cnpj)
+                if len(chunk) >= chunk_items:
+                    flush()
+            if chunk:
+                flush()
+            
+            with open(path + ".idx", "wb") as idx:
+                previous = None
+                for key, _ in CNPJBaseBuilder._merge(runs, cls.KEY_LEN, tmp):
+                    if key != previous:
+                        idx.write(key.encode("ascii"))
+                        previous = key
+                        count += 1
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return count
     
-    def lookup(self, cnpj: str) -> Optional[Dict]:
-        cnpj = self.clean(cnpj)
+    def candidates(self, query: str):
+        """Gera CNPJs candidatos (sem repetição); termos do nome são buscados por prefixo"""
+        if not re.search(r'[A-Za-z]', query):
+            doc = self.doc_term(query)
+            prefixes = [doc.ljust(self.TERM_LEN)] if doc else []
+        else:
+            prefixes = self.tokens(query)
+        if not prefixes:
+            return
         
-        if not self.validate(cnpj):
-            return {"error": "CNPJ inválido"}
+        # Varre o termo mais raro; os demais restringem por interseção quando pequenos
+        ranges = sorted((self.table.prefix_range(p) for p in prefixes), key=lambda r: r[1] - r[0])
+        start, stop = ranges[0]
+        filters = [
+            {key[self.TERM_LEN:] for key in self.table.keys(a, b)}
+            for a, b in ranges[1:] if b - a <= self.INTERSECT_LIMIT
+        ]
         
-        for api in self.APIS:
-            try:
-                url = api.format(cnpj=cnpj)
-                resp = requests.get(url, timeout=10, headers={
-                    'User-Agent': 'OSINT-Brasil/2.0 (Educational Purpose)'
-                })
-                if resp.status_code == 200:
-                    data = resp.json()
-                    return self._normalize(data)
-            except:
+        seen = set()
+        for key in self.table.keys(start, stop):
+            cnpj = key[self.TERM_LEN:]
+            if cnpj in seen:
                 continue
-        
-        return {"error": "Não foi possível consultar o CNPJ"}
+            seen.add(cnpj)
+            if all(cnpj in f for f in filters):
+                yield cnpj
     
-    def _normalize(self, data: Dict) -> Dict:
-        """Normaliza resposta de diferentes APIs"""
-        return {
-            "cnpj": data.get("cnpj", data.get("estabelecimento", {}).get("cnpj", "")),
-            "razao_social": data.get("nome", data.get("razao_social", "")),
-            "nome_fantasia": data.get("fantasia", data.get("nome_fantasia", "")),
-            "situacao": data.get("situacao", data.get("descricao_situacao_cadastral", "")),
-            "data_abertura": data.get("abertura", data.get("data_inicio_atividade", "")),
-            "cnae_principal": data.get("atividade_principal", [{}])[0].get("text", "") if isinstance(data.get("atividade_principal"), list) else data.get("cnae_fiscal_descricao", ""),
-            "endereco": {
-                "logradouro": data.get("logradouro", ""),
-                "numero": data.get("numero", ""),
-                "bairro": data.get("bairro", ""),
-                "cidade": data.get("municipio", ""),
-                "uf": data.get("uf", ""),
-                "cep": data.get("cep", "")
-            },
-            "telefone": data.get("telefone", ""),
-            "email": data.get("email", ""),
-            "capital_social": data.get("capital_social", ""),
-            "socios": data.get("qsa", [])
-        }
+    def close(self):
+        self.table.close()
 
 
-class CEPLookup:
+class CEPLookup(ProviderLookup):
     """Consulta CEP via múltiplas APIs"""
     
     APIS = [
@@ -139,37 +2057,56 @@ class CEPLookup:
         "https://brasilapi.com.br/api/cep/v1/{cep}",
         "https://opencep.com/v1/{cep}"
     ]
+    PARAM = "cep"
+    NOT_FOUND = "CEP não encontrado"
     
     @staticmethod
     def clean(cep: str) -> str:
         return re.sub(r'\D', '', cep)
     
-    def lookup(self, cep: str) -> Optional[Dict]:
-        cep = self.clean(cep)
-        
+    def _offline(self, cep: str) -> Optional[Dict]:
+        """Responde o que dispensa rede (formato inválido)"""
         if len(cep) != 8:
             return {"error": "CEP inválido - deve ter 8 dígitos"}
+        return None
+    
+    def lookup(self, cep: str) -> Optional[Dict]:
+        return self.lookup_key(self.clean(cep))
+    
+    def lookup_key(self, cep: str) -> Optional[Dict]:
+        """Consulta um CEP já limpo (só dígitos), sem repetir a limpeza"""
+        local = self._offline(cep)
+        if local is not None:
+            return local
         
-        for api in self.APIS:
-            try:
-                url = api.format(cep=cep)
-                resp = requests.get(url, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if not data.get("erro"):
-                        return {
-                            "cep": cep,
-                            "logradouro": data.get("logradouro", data.get("street", "")),
-                            "bairro": data.get("bairro", data.get("neighborhood", "")),
-                            "cidade": data.get("localidade", data.get("city", "")),
-                            "uf": data.get("uf", data.get("state", "")),
-                            "ddd": data.get("ddd", ""),
-                            "ibge": data.get("ibge", "")
-                        }
-            except:
-                continue
+        return self._cached("cep", cep, lambda: (self._fetch_any(cep), None))
+    
+    def _parse(self, data: Dict, key: str) -> Optional[Dict]:
+        if data.get("erro"):
+            return None
+        return {
+            "cep": key,
+            "logradouro": data.get("logradouro", data.get("street", "")),
+            "bairro": data.get("bairro", data.get("neighborhood", "")),
+            "cidade": data.get("localidade", data.get("city", "")),
+            "uf": data.get("uf", data.get("state", "")),
+            "ddd": data.get("ddd", ""),
+            "ibge": data.get("ibge", "")
+        }
+
+
+class AsyncCEPLookup(AsyncProviderLookup, CEPLookup):
+    """CEPLookup assíncrono (requer AsyncHTTPTransport)"""
+    
+    async def lookup(self, cep: str) -> Optional[Dict]:
+        return await self.lookup_key(self.clean(cep))
+    
+    async def lookup_key(self, cep: str) -> Optional[Dict]:
+        local = self._offline(cep)
+        if local is not None:
+            return local
         
-        return {"error": "CEP não encontrado"}
+        return await self._cached("cep", cep, lambda: self._fetch_any(cep))
 
 
 class PhoneLookup:
@@ -259,8 +2196,10 @@ class PhoneLookup:
         return re.sub(r'\D', '', phone)
     
     def lookup(self, phone: str) -> Dict:
-        phone = self.clean(phone)
-        
+        return self.lookup_key(self.clean(phone))
+    
+    def lookup_key(self, phone: str) -> Dict:
+        """Interpreta um telefone já limpo (só dígitos)"""
         # Remove código do país se presente
         if phone.startswith("55") and len(phone) > 11:
             phone = phone[2:]
@@ -285,140 +2224,1069 @@ class PhoneLookup:
         return result
 
 
-class DomainLookup:
+class DNSCache:
+    """Cache de respostas DNS por (nome, tipo) que respeita o TTL de cada resposta
+    
+    Respostas negativas (NXDOMAIN e NODATA) ficam em cache pelo mínimo do SOA da
+    Authority (RFC 2308); falhas do servidor (SERVFAIL etc.) não são guardadas. Os TTLs
+    devolvidos são os restantes, como num resolvedor de verdade.
+    """
+    
+    # TTL negativo quando a resposta não traz SOA
+    NEGATIVE_TTL = 300
+    
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        # (nome, tipo) -> (resposta, armazenada em, expira em)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def ttl(data: Dict) -> Optional[int]:
+        """TTL de uma resposta no formato DoH JSON (None: não deve ir para o cache)"""
+        if data.get("Status", 0) not in (0, 3):
+            return None
+        if data.get("Answer"):
+            ttls = [r["TTL"] for r in data["Answer"] if isinstance(r.get("TTL"), int)]
+            return min(ttls) if ttls else None
+        
+        for record in data.get("Authority", []):
+            if record.get("type") == 6 and isinstance(record.get("TTL"), int):
+                fields = str(record.get("data", "")).split()
+                if len(fields) == 7 and fields[6].isdigit():
+                    return min(record["TTL"], int(fields[6]))
+                return record["TTL"]
+        return DNSCache.NEGATIVE_TTL
+    
+    @staticmethod
+    def _aged(data: Dict, elapsed: int) -> Dict:
+        data = dict(data)
+        for section in ("Answer", "Authority"):
+            if section in data:
+                data[section] = [dict(r, TTL=max(0, r["TTL"] - elapsed)) if isinstance(r.get("TTL"), int) else r
+                                 for r in data[section]]
+        return data
+    
+    def get(self, name: str, rtype: str) -> Optional[Dict]:
+        key = (name.lower().rstrip("."), rtype)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, stored, expires = entry
+            if now >= expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        
+        elapsed = int(now - stored)
+        return self._aged(data, elapsed) if elapsed else data
+    
+    def set(self, name: str, rtype: str, data: Dict):
+        ttl = self.ttl(data)
+        if not ttl or ttl <= 0:
+            return
+        key = (name.lower().rstrip("."), rtype)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (data, now, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DoHResolver:
+    """Resolve (nome, tipo) via DNS-over-HTTPS JSON, com cache por TTL e consultas agrupadas"""
+    
+    URL = "https://dns.google/resolve?name={name}&type={type}"
+    
+    def __init__(self, http: Optional[HTTPTransport] = None, cache: Optional[DNSCache] = None,
+                 url: Optional[str] = None):
+        self.http = http or HTTPTransport()
+        self.cache = cache
+        self.url = url or self.URL
+        self.flight = SingleFlight()
+    
+    @property
+    def endpoint(self) -> str:
+        """Host do resolvedor, como chave das cotas do RateLimiter"""
+        return urlsplit(self.url).netloc
+    
+    def _fetch(self, name: str, rtype: str) -> Optional[Dict]:
+        try:
+            resp = self.http.get(self.url.format(name=name, type=rtype), timeout=10)
+            if resp.status_code == 200:
+                data = resp.json()
+                if isinstance(data, dict):
+                    return data
+        except Exception:
+            pass
+        return None
+    
+    def query(self, name: str, rtype: str) -> Optional[Dict]:
+        """Resposta no formato DoH JSON (Status, Answer, Authority) ou None se a consulta falhou"""
+        if self.cache is not None:
+            data = self.cache.get(name, rtype)
+            if data is not None:
+                return data
+        
+        def load():
+            data = self._fetch(name, rtype)
+            if data is not None and self.cache is not None:
+                self.cache.set(name, rtype, data)
+            return data
+        
+        # Mil emails do mesmo domínio ao mesmo tempo: uma única consulta MX
+        return self.flight.do((name, rtype), load)
+    
+    def close(self):
+        """O transporte HTTP é fechado por quem o criou"""
+
+
+class AsyncDoHResolver(DoHResolver):
+    """DoHResolver sobre o AsyncHTTPTransport"""
+    
+    def __init__(self, http: "AsyncHTTPTransport", cache: Optional[DNSCache] = None,
+                 url: Optional[str] = None):
+        self.http = http
+        self.cache = cache
+        self.url = url or self.URL
+        self.flight = AsyncSingleFlight()
+    
+    async def _fetch(self, name: str, rtype: str) -> Optional[Dict]:
+        try:
+            status, data = await self.http.get_json(self.url.format(name=name, type=rtype))
+            if status == 200 and isinstance(data, dict):
+                return data
+        except ImportError:
+            raise
+        except Exception:
+            pass
+        return None
+    
+    async def query(self, name: str, rtype: str) -> Optional[Dict]:
+        if self.cache is not None:
+            data = self.cache.get(name, rtype)
+            if data is not None:
+                return data
+        
+        async def load():
+            data = await self._fetch(name, rtype)
+            if data is not None and self.cache is not None:
+                self.cache.set(name, rtype, data)
+            return data
+        
+        return await self.flight.do((name, rtype), load)
+    
+    async def close(self):
+        pass
+
+
+class DNSWire:
+    """Mensagens DNS (RFC 1035) em bytes: monta consultas e decodifica respostas no formato do DoH JSON"""
+    
+    TYPES = {"A": 1, "NS": 2, "CNAME": 5, "SOA": 6, "PTR": 12, "MX": 15, "TXT": 16,
+             "AAAA": 28, "SRV": 33, "DS": 43, "DNSKEY": 48, "ANY": 255, "CAA": 257}
+    HEADER = struct.Struct(">HHHHHH")
+    RECORD = struct.Struct(">HHIH")
+    # Pseudo-registro OPT (EDNS0): aceita respostas UDP de até 4096 bytes antes de truncar
+    EDNS = b"\x00" + struct.pack(">HHIH", 41, 4096, 0, 0)
+    
+    @classmethod
+    def question(cls, name: str, rtype: str) -> bytes:
+        """Seção de pergunta (nome, tipo, classe IN); ValueError se o nome ou o tipo for inválido"""
+        rtype = rtype.upper()
+        code = cls.TYPES.get(rtype)
+        if code is None and rtype.startswith("TYPE") and rtype[4:].isdigit():
+            code = int(rtype[4:])
+        if code is None or code > 0xFFFF:
+            raise ValueError(f"Tipo de registro desconhecido: {rtype}")
+        
+        qname = b""
+        name = name.strip(".")
+        for label in (name.encode("idna").split(b".") if name else []):
+            if not 0 < len(label) < 64:
+                raise ValueError(f"Nome DNS inválido: {name}")
+            qname += bytes([len(label)]) + label
+        if len(qname) > 254:
+            raise ValueError(f"Nome DNS inválido: {name}")
+        return qname + b"\x00" + struct.pack(">HH", code, 1)
+    
+    @classmethod
+    def query(cls, qid: int, question: bytes) -> bytes:
+        # RD ligado: o endereço configurado é um resolvedor recursivo
+        return cls.HEADER.pack(qid, 0x0100, 1, 0, 0, 1) + question + cls.EDNS
+    
+    @staticmethod
+    def truncated(msg: bytes) -> bool:
+        return bool(msg[2] & 0x02)
+    
+    @staticmethod
+    def _name(msg: bytes, pos: int) -> Tuple[str, int]:
+        """Lê um nome (seguindo ponteiros de compressão); retorna (nome, posição após o nome)"""
+        labels = []
+        end = None
+        for _ in range(128):
+            length = msg[pos]
+            if length & 0xC0 == 0xC0:
+                if end is None:
+                    end = pos + 2
+                pos = ((length & 0x3F) << 8) | msg[pos + 1]
+            elif length:
+                labels.append(msg[pos + 1:pos + 1 + length].decode("ascii", "replace"))
+                pos += 1 + length
+            else:
+                return ".".join(labels) + ".", end if end is not None else pos + 1
+        raise ValueError("Ponteiros de compressão em laço")
+    
+    @classmethod
+    def _rdata(cls, msg: bytes, rtype: int, pos: int, length: int) -> str:
+        """Dados do registro no texto que o DoH JSON usa"""
+        rdata = msg[pos:pos + length]
+        if rtype == 1 and length == 4:
+            return str(ipaddress.IPv4Address(rdata))
+        if rtype == 28 and length == 16:
+            return str(ipaddress.IPv6Address(rdata))
+        if rtype in (2, 5, 12):
+            return cls._name(msg, pos)[0]
+        if rtype == 15:
+            return f"{struct.unpack_from('>H', msg, pos)[0]} {cls._name(msg, pos + 2)[0]}"
+        if rtype == 6:
+            mname, pos = cls._name(msg, pos)
+            rname, pos = cls._name(msg, pos)
+            return " ".join([mname, rname] + [str(v) for v in struct.unpack_from(">IIIII", msg, pos)])
+        if rtype == 16:
+            strings, offset = [], 0
+            while offset < length:
+                size = rdata[offset]
+                strings.append(rdata[offset + 1:offset + 1 + size].decode("utf-8", "replace"))
+                offset += 1 + size
+            return "".join(strings)
+        if rtype == 33:
+            priority, weight, port = struct.unpack_from(">HHH", msg, pos)
+            return f"{priority} {weight} {port} {cls._name(msg, pos + 6)[0]}"
+        if rtype == 257 and length >= 2:
+            tag = rdata[2:2 + rdata[1]].decode("ascii", "replace")
+            return f'{rdata[0]} {tag} "{rdata[2 + rdata[1]:].decode("utf-8", "replace")}"'
+        return rdata.hex()
+    
+    @classmethod
+    def decode(cls, msg: bytes) -> Dict:
+        """Resposta em bytes -> {"Status", "TC", "Question", "Answer", "Authority"} (ValueError se malformada)"""
+        try:
+            _, flags, qdcount, ancount, nscount, _ = cls.HEADER.unpack_from(msg)
+            data = {"Status": flags & 0x000F, "TC": bool(flags & 0x0200), "RD": bool(flags & 0x0100),
+                    "RA": bool(flags & 0x0080), "AD": bool(flags & 0x0020), "CD": bool(flags & 0x0010)}
+            
+            pos = cls.HEADER.size
+            questions = []
+            for _ in range(qdcount):
+                name, pos = cls._name(msg, pos)
+                questions.append({"name": name, "type": struct.unpack_from(">H", msg, pos)[0]})
+                pos += 4
+            data["Question"] = questions
+            
+            # A seção adicional (OPT, glue) não entra no formato DoH
+            for section, count in (("Answer", ancount), ("Authority", nscount)):
+                records = []
+                for _ in range(count):
+                    name, pos = cls._name(msg, pos)
+                    rtype, _, ttl, length = cls.RECORD.unpack_from(msg, pos)
+                    pos += cls.RECORD.size
+                    if pos + length > len(msg):
+                        raise ValueError("registro além do fim da mensagem")
+                    records.append({"name": name, "type": rtype, "TTL": ttl,
+                                    "data": cls._rdata(msg, rtype, pos, length)})
+                    pos += length
+                if records:
+                    data[section] = records
+        except (IndexError, struct.error, UnicodeError) as e:
+            raise ValueError(f"Resposta DNS malformada: {e}")
+        return data
+
+
+class WireResolver(DoHResolver):
+    """Resolve direto pelo protocolo DNS em UDP, repetindo por TCP quando a resposta vem truncada
+    
+    Todas as consultas compartilham um único socket UDP e são casadas com as respostas pelo
+    ID da mensagem, então milhares podem estar em voo ao mesmo tempo. As respostas saem no
+    formato do DoHResolver (e passam pelo mesmo cache por TTL).
+    """
+    
+    PORT = 53
+    # Buffer de recepção do socket: rajadas de respostas não se perdem no kernel
+    RECV_BUFFER = 4 * 1024 * 1024
+    
+    def __init__(self, address: str = "8.8.8.8", cache: Optional[DNSCache] = None,
+                 timeout: float = 2.0, retries: int = 2, limiter: Optional[RateLimiter] = None):
+        self.host, self.port = self.parse_address(address)
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        # Cota de consultas por segundo do resolvedor, chaveada por ``endpoint``
+        self.limiter = limiter
+        self.flight = SingleFlight()
+        # ID da mensagem -> (pergunta, Future da resposta)
+        self._pending: Dict[int, Tuple[bytes, Future]] = {}
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+    
+    @classmethod
+    def parse_address(cls, address: str) -> Tuple[str, int]:
+        """'host', 'host:porta', '[ipv6]:porta' ou IPv6 sem colchetes -> (host, porta)"""
+        if address.startswith("["):
+            host, _, port = address[1:].partition("]")
+            port = port.lstrip(":")
+        elif address.count(":") == 1:
+            host, port = address.split(":")
+        else:
+            host, port = address, ""
+        return host, int(port) if port else cls.PORT
+    
+    @property
+    def endpoint(self) -> str:
+        """'host' (porta 53) ou 'host:porta', como o netloc de uma URL"""
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        return host if self.port == self.PORT else f"{host}:{self.port}"
+    
+    @staticmethod
+    def _new_id(pending: Dict[int, Any]) -> int:
+        qid = random.getrandbits(16)
+        while qid in pending:
+            qid = random.getrandbits(16)
+        return qid
+    
+    @classmethod
+    def _grow_buffer(cls, sock: socket.socket):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, cls.RECV_BUFFER)
+        except OSError:
+            pass
+    
+    def _socket(self) -> socket.socket:
+        with self._lock:
+            if self._sock is None:
+                family, _, _, _, addr = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_DGRAM)[0]
+                sock = socket.socket(family, socket.SOCK_DGRAM)
+                self._grow_buffer(sock)
+                # connect(): o kernel descarta datagramas que não vêm do resolvedor
+                sock.connect(addr)
+                sock.settimeout(1.0)
+                self._sock = sock
+                threading.Thread(target=self._receive, args=(sock,), daemon=True).start()
+            return self._sock
+    
+    def _receive(self, sock: socket.socket):
+        """Thread leitora: entrega cada resposta ao Future da consulta com o mesmo ID"""
+        while True:
+            try:
+                msg = sock.recv(65535)
+            except socket.timeout:
+                if self._sock is not sock:
+                    return
+                continue
+            except ConnectionRefusedError:
+                # ICMP de porta fechada: as consultas em voo expiram pelo timeout
+                continue
+            except OSError:
+                return
+            
+            if len(msg) < DNSWire.HEADER.size:
+                continue
+            with self._lock:
+                entry = self._pending.get((msg[0] << 8) | msg[1])
+                # Resposta a outra pergunta (atrasada ou forjada) com um ID reaproveitado
+                if entry is None or msg[12:12 + len(entry[0])] != entry[0]:
+                    continue
+                del self._pending[(msg[0] << 8) | msg[1]]
+            if not entry[1].done():
+                entry[1].set_result(msg)
+    
+    def _exchange(self, question: bytes) -> Optional[bytes]:
+        if self.limiter is not None:
+            delay = self.limiter.reserve(self.endpoint)
+            if delay > 0:
+                time.sleep(delay)
+        
+        sock = self._socket()
+        future: Future = Future()
+        with self._lock:
+            qid = self._new_id(self._pending)
+            self._pending[qid] = (question, future)
+        try:
+            sock.send(DNSWire.query(qid, question))
+            return future.result(timeout=self.timeout)
+        except Exception:
+            return None
+        finally:
+            with self._lock:
+                if self._pending.get(qid, (None, None))[1] is future:
+                    del self._pending[qid]
+    
+    def _tcp(self, question: bytes) -> bytes:
+        msg = DNSWire.query(random.getrandbits(16), question)
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(struct.pack(">H", len(msg)) + msg)
+            stream = sock.makefile("rb")
+            length = struct.unpack(">H", stream.read(2))[0]
+            reply = stream.read(length)
+        if len(reply) != length or reply[:2] != msg[:2]:
+            raise ValueError("Resposta TCP incompleta")
+        return reply
+    
+    def _fetch(self, name: str, rtype: str) -> Optional[Dict]:
+        try:
+            question = DNSWire.question(name, rtype)
+        except ValueError:
+            return None
+        
+        for _ in range(self.retries + 1):
+            msg = self._exchange(question)
+            if msg is not None:
+                break
+        else:
+            return None
+        
+        try:
+            if DNSWire.truncated(msg):
+                msg = self._tcp(question)
+            return DNSWire.decode(msg)
+        except (OSError, ValueError, struct.error):
+            return None
+    
+    def close(self):
+        with self._lock:
+            sock, self._sock = self._sock, None
+            pending, self._pending = self._pending, {}
+        if sock is not None:
+            sock.close()
+        for _, future in pending.values():
+            future.cancel()
+
+
+class AsyncWireResolver(AsyncDoHResolver, asyncio.DatagramProtocol):
+    """WireResolver sobre asyncio: um socket UDP no event loop, sem threads"""
+    
+    PORT = WireResolver.PORT
+    endpoint = WireResolver.endpoint
+    
+    def __init__(self, address: str = "8.8.8.8", cache: Optional[DNSCache] = None,
+                 timeout: float = 2.0, retries: int = 2, limiter: Optional[RateLimiter] = None):
+        self.host, self.port = WireResolver.parse_address(address)
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter
+        self.flight = AsyncSingleFlight()
+        self._pending: Dict[int, Tuple[bytes, "asyncio.Future"]] = {}
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._connecting: Optional["asyncio.Future"] = None
+    
+    async def _endpoint(self) -> asyncio.DatagramTransport:
+        if self._transport is None:
+            # Uma única criação do socket mesmo com milhares de consultas chegando juntas
+            if self._connecting is None:
+                loop = asyncio.get_running_loop()
+                self._connecting = asyncio.ensure_future(loop.create_datagram_endpoint(
+                    lambda: self, remote_addr=(self.host, self.port)))
+            connecting = self._connecting
+            try:
+                await asyncio.shield(connecting)
+            finally:
+                if connecting.done() and self._connecting is connecting:
+                    self._connecting = None
+        return self._transport
+    
+    def connection_made(self, transport: asyncio.DatagramTransport):
+        self._transport = transport
+        WireResolver._grow_buffer(transport.get_extra_info("socket"))
+    
+    def datagram_received(self, msg: bytes, addr: Any):
+        if len(msg) < DNSWire.HEADER.size:
+            return
+        entry = self._pending.get((msg[0] << 8) | msg[1])
+        if entry is None or msg[12:12 + len(entry[0])] != entry[0] or entry[1].done():
+            return
+        entry[1].set_result(msg)
+    
+    def error_received(self, exc: Exception):
+        # ICMP de porta fechada: as consultas em voo expiram pelo timeout
+        pass
+    
+    def connection_lost(self, exc: Optional[Exception]):
+        self._transport = None
+        for _, future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Socket DNS fechado"))
+    
+    async def _exchange(self, question: bytes) -> Optional[bytes]:
+        if self.limiter is not None:
+            delay = self.limiter.reserve(self.endpoint)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        
+        transport = await self._endpoint()
+        future = asyncio.get_running_loop().create_future()
+        qid = WireResolver._new_id(self._pending)
+        self._pending[qid] = (question, future)
+        try:
+            transport.sendto(DNSWire.query(qid, question))
+            return await asyncio.wait_for(future, self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            if self._pending.get(qid, (None, None))[1] is future:
+                del self._pending[qid]
+    
+    async def _tcp(self, question: bytes) -> bytes:
+        msg = DNSWire.query(random.getrandbits(16), question)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            writer.write(struct.pack(">H", len(msg)) + msg)
+            length = struct.unpack(">H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            reply = await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+        if reply[:2] != msg[:2]:
+            raise ValueError("Resposta TCP de outra consulta")
+        return reply
+    
+    async def _fetch(self, name: str, rtype: str) -> Optional[Dict]:
+        try:
+            question = DNSWire.question(name, rtype)
+        except ValueError:
+            return None
+        
+        for _ in range(self.retries + 1):
+            msg = await self._exchange(question)
+            if msg is not None:
+                break
+        else:
+            return None
+        
+        try:
+            if DNSWire.truncated(msg):
+                msg = await self._tcp(question)
+            return DNSWire.decode(msg)
+        except (OSError, ValueError, EOFError, asyncio.TimeoutError, struct.error):
+            return None
+    
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+
+class DomainLookup(CachedLookup):
     """Consulta informações de domínios .br"""
     
-    def lookup(self, domain: str) -> Dict:
+    RECORD_TYPES = ["A", "MX", "NS"]
+    RESOLVER = DoHResolver
+    
+    def __init__(self, http: Optional[HTTPTransport] = None, cache: Optional[Any] = None,
+                 flight: Optional[SingleFlight] = None, record_types: Optional[List[str]] = None,
+                 resolver: Optional[DoHResolver] = None):
+        self.http = http or HTTPTransport()
+        self.cache = cache
+        self.flight = flight
+        # Resolvedor compartilhado com o EmailLookup (e o cache DNS dele)
+        self.resolver = resolver or self.RESOLVER(self.http)
+        # Ex.: ["A", "AAAA", "MX", "NS", "TXT", "SOA", "CAA"]
+        self.record_types = [rtype.upper() for rtype in record_types] if record_types else list(self.RECORD_TYPES)
+        # Pool dos tipos de registro compartilhado entre consultas (criado no primeiro uso)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_size = 0
+        self._retired: List[ThreadPoolExecutor] = []
+        self._executor_lock = threading.Lock()
+    
+    def _types_executor(self) -> ThreadPoolExecutor:
+        """Pool do tamanho do pool de conexões do resolvedor: toda consulta em voo tem conexão keep-alive
+        
+        Acompanha o ``resize`` do transporte (ex.: bulk com mais workers): o pool antigo
+        é substituído por um maior e só é encerrado no ``close``, pois outra thread pode
+        estar prestes a usá-lo.
+        """
+        # Uma consulta sozinha ainda manda todos os tipos ao mesmo tempo
+        if getattr(self.http, "pool_size", 0) < len(self.record_types):
+            self.http.resize(len(self.record_types))
+        size = max(len(self.record_types), getattr(self.http, "pool_size", 1))
+        
+        with self._executor_lock:
+            if self._executor is None or self._executor_size < size:
+                if self._executor is not None:
+                    self._retired.append(self._executor)
+                self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=type(self).__name__)
+                self._executor_size = size
+            return self._executor
+    
+    def close(self):
+        with self._executor_lock:
+            executors = self._retired + ([self._executor] if self._executor is not None else [])
+            self._executor, self._executor_size, self._retired = None, 0, []
+        for executor in executors:
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def normalize(domain: str) -> str:
         domain = domain.lower().strip()
         
         if not domain.endswith(".br"):
             domain += ".com.br"
-        
-        result = {
+        return domain
+    
+    def lookup(self, domain: str) -> Dict:
+        return self.lookup_key(self.normalize(domain))
+    
+    def lookup_key(self, domain: str) -> Dict:
+        """Consulta um domínio já normalizado"""
+        return self._cached("domain", self._cache_key(domain), lambda: self._resolve(domain))
+    
+    def _cache_key(self, domain: str) -> str:
+        # Resultados com outros tipos de registro não se misturam com os do padrão
+        if self.record_types == self.RECORD_TYPES:
+            return domain
+        return f"{domain}|{','.join(self.record_types)}"
+    
+    def _apply(self, result: Dict, rtype: str, data: Dict, ttls: List[int]):
+        """Incorpora a resposta DoH de um tipo de registro ao resultado"""
+        if data.get("Answer"):
+            result["dns"][rtype] = [r["data"] for r in data["Answer"]]
+        if rtype in ("A", "AAAA"):
+            result["online"] = result.get("online", False) or bool(data.get("Answer"))
+        ttl = DNSCache.ttl(data)
+        if ttl is not None:
+            ttls.append(ttl)
+    
+    def _new_result(self, domain: str) -> Dict:
+        return {
             "domain": domain,
             "dns": {},
             "whois_available": False
         }
+    
+    def _merge(self, domain: str, answers: List[Optional[Dict]]) -> Tuple[Dict, Optional[float]]:
+        """Monta o resultado a partir das respostas de cada tipo (None: consulta falhou)"""
+        result = self._new_result(domain)
+        ttls: List[int] = []
         
-        # DNS Lookup via API pública
-        try:
-            dns_resp = requests.get(
-                f"https://dns.google/resolve?name={domain}&type=A",
-                timeout=10
-            )
-            if dns_resp.status_code == 200:
-                dns_data = dns_resp.json()
-                if dns_data.get("Answer"):
-                    result["dns"]["A"] = [r["data"] for r in dns_data["Answer"]]
-                    result["online"] = True
-                else:
-                    result["online"] = False
-        except:
-            pass
-        
-        # MX Records
-        try:
-            mx_resp = requests.get(
-                f"https://dns.google/resolve?name={domain}&type=MX",
-                timeout=10
-            )
-            if mx_resp.status_code == 200:
-                mx_data = mx_resp.json()
-                if mx_data.get("Answer"):
-                    result["dns"]["MX"] = [r["data"] for r in mx_data["Answer"]]
-        except:
-            pass
-        
-        # Nameservers
-        try:
-            ns_resp = requests.get(
-                f"https://dns.google/resolve?name={domain}&type=NS",
-                timeout=10
-            )
-            if ns_resp.status_code == 200:
-                ns_data = ns_resp.json()
-                if ns_data.get("Answer"):
-                    result["dns"]["NS"] = [r["data"] for r in ns_data["Answer"]]
-        except:
-            pass
+        failed = []
+        for rtype, data in zip(self.record_types, answers):
+            if data is None:
+                failed.append(rtype)
+            else:
+                self._apply(result, rtype, data, ttls)
         
-        return result
+        # Resultado incompleto (ex.: MX expirou) não vai para o cache
+        if failed:
+            result["failed"] = failed
+            return result, 0
+        return result, min(ttls) if ttls else 0
+    
+    def sweep_record(self, domain: str, answers: List[Optional[Dict]]) -> Dict:
+        """Registro compacto da varredura: online, registros por tipo, NXDOMAIN e tipos que falharam"""
+        result, _ = self._merge(domain, answers)
+        record = {"domain": domain, "online": result.get("online", False)}
+        record.update(result["dns"])
+        if any(data is not None and data.get("Status") == 3 for data in answers):
+            record["nxdomain"] = True
+        if "failed" in result:
+            record["failed"] = result["failed"]
+        return record
+    
+    def _query_type(self, name: str, rtype: str) -> Optional[Dict]:
+        return self.resolver.query(name, rtype)
+    
+    def _resolve(self, domain: str) -> Tuple[Dict, Optional[float]]:
+        """Consulta os tipos de registro em paralelo; retorna o resultado e o menor TTL das respostas"""
+        # Uma requisição por tipo ao mesmo tempo, pelo pool keep-alive do host: ~1 ida e volta
+        executor = self._types_executor()
+        answers = list(executor.map(lambda rtype: self._query_type(domain, rtype), self.record_types))
+        return self._merge(domain, answers)
 
 
-class EmailLookup:
+class EmailLookup(CachedLookup):
     """Verifica email em breaches conhecidos (via Have I Been Pwned API pública)"""
     
-    def lookup(self, email: str) -> Dict:
+    RESOLVER = DoHResolver
+    PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+    
+    def __init__(self, http: Optional[HTTPTransport] = None, cache: Optional[Any] = None,
+                 flight: Optional[SingleFlight] = None, resolver: Optional[DoHResolver] = None):
+        self.http = http or HTTPTransport()
+        self.cache = cache
+        self.flight = flight
+        self.resolver = resolver or self.RESOLVER(self.http)
+    
+    @staticmethod
+    def normalize(email: str) -> Optional[str]:
+        """Email em minúsculas, ou None se o formato for inválido"""
         email = email.lower().strip()
         
-        if not re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', email):
+        if not EmailLookup.PATTERN.match(email):
+            return None
+        return email
+    
+    def lookup(self, email: str) -> Dict:
+        return self.lookup_key(self.normalize(email))
+    
+    def lookup_key(self, email: Optional[str]) -> Dict:
+        """Consulta um email já normalizado (vazio ou None: formato inválido)"""
+        if not email:
             return {"error": "Email inválido"}
         
-        result = {
+        return self._cached("email", email, lambda: self._resolve(email))
+    
+    @staticmethod
+    def _new_result(email: str) -> Dict:
+        return {
             "email": email,
             "domain": email.split("@")[1],
             "hash_sha1": hashlib.sha1(email.encode()).hexdigest(),
             "hash_sha256": hashlib.sha256(email.encode()).hexdigest(),
         }
+    
+    @staticmethod
+    def _apply_mx(result: Dict, data: Dict) -> float:
+        """Incorpora a resposta MX ao resultado e retorna o TTL para o cache"""
+        result["domain_has_mx"] = bool(data.get("Answer"))
+        if data.get("Answer"):
+            result["mail_servers"] = [r["data"] for r in data["Answer"][:3]]
+        return DNSCache.ttl(data) or 0
+    
+    def _resolve(self, email: str) -> Tuple[Dict, Optional[float]]:
+        result = self._new_result(email)
         
         # Verifica MX do domínio para validar se email pode existir
-        try:
+        data = self.resolver.query(result["domain"], "MX")
+        if data is None:
+            result["domain_has_mx"] = None
+            result["failed"] = ["MX"]
+            return result, 0
+        return result, self._apply_mx(result, data)
+    
+    def _prepare_batch(self, emails: Iterable[str]) -> Tuple[List[Optional[str]], Dict[str, Tuple[str, str]], List[str]]:
+        """Normaliza os emails, calcula os hashes de cada endereço distinto e lista os domínios distintos"""
+        normalized = [self.normalize(email) for email in emails]
+        
+        sha1, sha256 = hashlib.sha1, hashlib.sha256
+        hashes: Dict[str, Tuple[str, str]] = {}
+        for email in normalized:
+            if email and email not in hashes:
+                data = email.encode()
+                hashes[email] = (sha1(data).hexdigest(), sha256(data).hexdigest())
+        
+        domains = list(dict.fromkeys(email.split("@")[1] for email in hashes))
+        return normalized, hashes, domains
+    
+    def _fan_out(self, normalized: List[Optional[str]], hashes: Dict[str, Tuple[str, str]],
+                 answers: Dict[str, Optional[Dict]]) -> List[Dict]:
+        """Distribui a resposta MX de cada domínio entre os emails dele, na ordem de entrada"""
+        results = []
+        for email in normalized:
+            if not email:
+                results.append({"error": "Email inválido"})
+                continue
+            
             domain = email.split("@")[1]
-            mx_resp = requests.get(
-                f"https://dns.google/resolve?name={domain}&type=MX",
-                timeout=10
-            )
-            if mx_resp.status_code == 200:
-                mx_data = mx_resp.json()
-                result["domain_has_mx"] = bool(mx_data.get("Answer"))
-                if mx_data.get("Answer"):
-                    result["mail_servers"] = [r["data"] for r in mx_data["Answer"][:3]]
-        except:
+            hash_sha1, hash_sha256 = hashes[email]
+            result = {"email": email, "domain": domain, "hash_sha1": hash_sha1, "hash_sha256": hash_sha256}
+            data = answers[domain]
+            if data is None:
+                result["domain_has_mx"] = None
+                result["failed"] = ["MX"]
+            else:
+                self._apply_mx(result, data)
+            results.append(result)
+        return results
+    
+    def lookup_batch(self, emails: Iterable[str], max_workers: int = 16) -> List[Dict]:
+        """Consulta muitos emails com uma única consulta MX por domínio; resultados na ordem de entrada
+        
+        Validação e hashes são feitos para a lista inteira antes de qualquer acesso à rede;
+        depois os domínios distintos são resolvidos uma vez cada (até ``max_workers`` ao
+        mesmo tempo). Em listas concentradas em poucos provedores quase todas as consultas
+        MX desaparecem.
+        """
+        normalized, hashes, domains = self._prepare_batch(emails)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            answers = dict(zip(domains, executor.map(lambda domain: self.resolver.query(domain, "MX"), domains)))
+        return self._fan_out(normalized, hashes, answers)
+
+
+class AsyncDomainLookup(AsyncCachedLookup, DomainLookup):
+    """DomainLookup assíncrono: os tipos de registro são consultados ao mesmo tempo"""
+    
+    RESOLVER = AsyncDoHResolver
+    
+    async def lookup(self, domain: str) -> Dict:
+        return await self.lookup_key(self.normalize(domain))
+    
+    async def lookup_key(self, domain: str) -> Dict:
+        return await self._cached("domain", self._cache_key(domain), lambda: self._resolve(domain))
+    
+    async def _query_type(self, name: str, rtype: str) -> Optional[Dict]:
+        return await self.resolver.query(name, rtype)
+    
+    async def _resolve(self, domain: str) -> Tuple[Dict, Optional[float]]:
+        answers = await asyncio.gather(*(self._query_type(domain, rtype) for rtype in self.record_types))
+        return self._merge(domain, answers)
+
+
+class AsyncEmailLookup(AsyncCachedLookup, EmailLookup):
+    """EmailLookup assíncrono (requer AsyncHTTPTransport)"""
+    
+    RESOLVER = AsyncDoHResolver
+    
+    async def lookup(self, email: str) -> Dict:
+        return await self.lookup_key(self.normalize(email))
+    
+    async def lookup_key(self, email: Optional[str]) -> Dict:
+        if not email:
+            return {"error": "Email inválido"}
+        
+        return await self._cached("email", email, lambda: self._resolve(email))
+    
+    async def _resolve(self, email: str) -> Tuple[Dict, Optional[float]]:
+        result = self._new_result(email)
+        
+        data = await self.resolver.query(result["domain"], "MX")
+        if data is None:
             result["domain_has_mx"] = None
+            result["failed"] = ["MX"]
+            return result, 0
+        return result, self._apply_mx(result, data)
+    
+    async def lookup_batch(self, emails: Iterable[str], concurrency: int = 100) -> List[Dict]:
+        normalized, hashes, domains = self._prepare_batch(emails)
+        semaphore = asyncio.Semaphore(concurrency)
         
-        return result
+        async def query(domain: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self.resolver.query(domain, "MX")
+        
+        answers = await asyncio.gather(*(query(domain) for domain in domains))
+        return self._fan_out(normalized, hashes, dict(zip(domains, answers)))
 
 
 class CPFValidator:
     """Validador de CPF (apenas validação matemática, sem consulta)"""
     
+    # Região fiscal de origem pelo 9º dígito (regra antiga)
+    ESTADOS_CPF = {
+        "0": "RS", "1": "DF/GO/MS/MT/TO", "2": "AC/AM/AP/PA/RO/RR",
+        "3": "CE/MA/PI", "4": "AL/PB/PE/RN", "5": "BA/SE",
+        "6": "MG", "7": "ES/RJ", "8": "SP", "9": "PR/SC"
+    }
+    
+    # Código de região devolvido pelo validate_batch para entradas malformadas
+    REGIAO_INVALIDA = 255
+    
+    WEIGHTS_1 = [10, 9, 8, 7, 6, 5, 4, 3, 2]
+    WEIGHTS_2 = [11, 10, 9, 8, 7, 6, 5, 4, 3, 2]
+    
     @staticmethod
     def clean(cpf: str) -> str:
         return re.sub(r'\D', '', cpf)
     
     @staticmethod
     def validate(cpf: str) -> Dict:
-        cpf = CPFValidator.clean(cpf)
-        
+        return CPFValidator.validate_key(CPFValidator.clean(cpf))
+    
+    @staticmethod
+    def is_valid(cpf: str) -> bool:
+        """Confere os dígitos verificadores de um CPF já limpo (só dígitos)"""
+        if len(cpf) != 11 or cpf == cpf[0] * 11:
+            return False
+        digits = [ord(c) - 48 for c in cpf]
+        d1 = sum(map(operator.mul, digits, CPFValidator.WEIGHTS_1)) * 10 % 11 % 10
+        d2 = sum(map(operator.mul, digits, CPFValidator.WEIGHTS_2)) * 10 % 11 % 10
+        return digits[9] == d1 and digits[10] == d2
+    
+    @staticmethod
+    def validate_key(cpf: str) -> Dict:
+        """Valida um CPF já limpo (só dígitos)"""
         if len(cpf) != 11:
             return {"valid": False, "error": "CPF deve ter 11 dígitos"}
         
         if cpf == cpf[0] * 11:
             return {"valid": False, "error": "CPF com dígitos repetidos"}
         
-        # Calcula primeiro dígito verificador
-        sum1 = sum(int(cpf[i]) * (10 - i) for i in range(9))
-        d1 = (sum1 * 10 % 11) % 10
-        
-        # Calcula segundo dígito verificador
-        sum2 = sum(int(cpf[i]) * (11 - i) for i in range(10))
-        d2 = (sum2 * 10 % 11) % 10
-        
-        valid = cpf[-2:] == f"{d1}{d2}"
-        
-        # Identifica estado de origem (pelos primeiros dígitos - regra antiga)
-        ESTADOS_CPF = {
-            "0": "RS", "1": "DF/GO/MS/MT/TO", "2": "AC/AM/AP/PA/RO/RR",
-            "3": "CE/MA/PI", "4": "AL/PB/PE/RN", "5": "BA/SE",
-            "6": "MG", "7": "ES/RJ", "8": "SP", "9": "PR/SC"
-        }
+        valid = CPFValidator.is_valid(cpf)
         
         return {
             "cpf": cpf,
             "cpf_formatado": f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
             "valid": valid,
-            "estado_origem_provavel": ESTADOS_CPF.get(cpf[8], "Desconhecido")
+            "estado_origem_provavel": CPFValidator.ESTADOS_CPF.get(cpf[8], "Desconhecido")
         }
+    
+    @staticmethod
+    def validate_batch(cpfs: Any) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Valida milhões de CPFs de uma vez (requer numpy)
+        
+        Aceita sequência de strings, ``bytes`` (11 dígitos colados ou um por linha) ou
+        array NumPy (strings, inteiros ou matriz n x 11). Retorna a máscara de válidos e o
+        código da região fiscal (9º dígito, chave de ESTADOS_CPF; REGIAO_INVALIDA se malformado).
+        """
+        _require_numpy()
+        matrix = _digit_matrix(cpfs, 11)
+        valid = np.zeros(len(matrix), dtype=bool)
+        regions = np.full(len(matrix), CPFValidator.REGIAO_INVALIDA, dtype=np.uint8)
+        
+        for start in range(0, len(matrix), BATCH_ROWS):
+            columns, well_formed = _digit_columns(matrix[start:start + BATCH_ROWS])
+            d1, d2 = _check_digit_pair(columns, CPFValidator.WEIGHTS_1, CPFValidator.WEIGHTS_2)
+            
+            repeated = (columns == columns[0]).all(axis=0)
+            valid[start:start + BATCH_ROWS] = (well_formed & ~repeated
+                                                & (columns[9] == d1) & (columns[10] == d2))
+            regions[start:start + BATCH_ROWS] = np.where(well_formed, columns[8],
+                                                         CPFValidator.REGIAO_INVALIDA)
+        
+        return valid, regions
+
+
+class DocumentScanner:
+    """Valida CPF/CNPJ direto sobre um arquivo mapeado em memória, sem criar str por linha
+    
+    Uma linha por registro. O campo é lido por posição fixa (``record_length`` bytes por
+    registro, campo em ``field_start``) ou pelo índice ``field`` entre ``delimiter``s,
+    opcionalmente entre aspas. Só dígitos crus são aceitos: campos formatados contam como inválidos.
+    """
+    
+    WIDTHS = {"cpf": 11, "cnpj": 14}
+    
+    # Bytes do arquivo processados por vez no modo delimitado
+    BLOCK = 16 * 1024 * 1024
+    
+    def __init__(self, kind: str = "cpf", delimiter: Optional[str] = None, field: int = 0,
+                 record_length: Optional[int] = None, field_start: int = 0, quote: str = '"'):
+        if kind not in self.WIDTHS:
+            raise ValueError(f"Tipo de documento não suportado: {kind}")
+        _require_numpy()
+        self.kind = kind
+        self.width = self.WIDTHS[kind]
+        self.delimiter = ord(delimiter) if delimiter else None
+        self.field = field
+        self.record_length = record_length
+        self.field_start = field_start
+        self.quote = ord(quote) if quote else None
+    
+    def _validate(self, matrix: "np.ndarray") -> "np.ndarray":
+        if self.kind == "cpf":
+            return CPFValidator.validate_batch(matrix)[0]
+        return CNPJLookup.validate_batch(matrix)[0]
+    
+    def _fixed_blocks(self, data: "np.ndarray") -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+        """(início de cada linha, máscara) por bloco de registros de largura fixa"""
+        rows = len(data) // self.record_length
+        records = data[:rows * self.record_length].reshape(rows, self.record_length)
+        fields = records[:, self.field_start:self.field_start + self.width]
+        for start in range(0, rows, BATCH_ROWS):
+            block = fields[start:start + BATCH_ROWS]
+            offsets = np.arange(start, start + len(block), dtype=np.uint64) * np.uint64(self.record_length)
+            yield offsets, self._validate(block)
+    
+    def _delimited_blocks(self, data: "np.ndarray", mm: mmap.mmap) -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+        """(início de cada linha, máscara) por bloco de linhas completas do arquivo"""
+        size = len(data)
+        position = 0
+        columns = np.arange(self.width)
+        while position < size:
+            # O bloco sempre termina em fim de linha (ou no fim do arquivo)
+            end = position + self.BLOCK
+            if end < size:
+                newline = mm.find(b"\n", end)
+                end = size if newline < 0 else newline + 1
+            else:
+                end = size
+            block = data[position:end]
+            
+            ends = np.flatnonzero(block == 0x0A)
+            if not len(ends) or ends[-1] != len(block) - 1:
+                ends = np.append(ends, len(block))
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            # CRLF: o \r não faz parte do último campo
+            content_ends = ends - ((ends > starts) & (block[np.maximum(ends - 1, 0)] == 0x0D))
+            
+            # Posições dos delimitadores, com o fim do bloco como sentinela
+            if self.delimiter is not None:
+                bounds = np.append(np.flatnonzero(block == self.delimiter), len(block))
+            else:
+                bounds = np.array([len(block)])
+            
+            if self.field == 0:
+                field_starts = starts
+            else:
+                index = np.searchsorted(bounds[:-1], starts) + self.field - 1
+                field_starts = bounds[np.minimum(index, len(bounds) - 1)] + 1
+            present = field_starts <= content_ends
+            field_ends = np.minimum(bounds[np.searchsorted(bounds[:-1], field_starts)], content_ends)
+            
+            if self.quote is not None:
+                last = len(block) - 1
+                quoted = present & (field_ends - field_starts >= 2) & (block[np.minimum(field_starts, last)] == self.quote)
+                field_starts = field_starts + quoted
+                field_ends = field_ends - (quoted & (block[np.maximum(field_ends - 1, 0)] == self.quote))
+            
+            present &= field_ends - field_starts == self.width
+            matrix = block[np.minimum(field_starts[:, None] + columns, len(block) - 1)]
+            yield starts.astype(np.uint64) + np.uint64(position), present & self._validate(matrix)
+            position = end
+    
+    def scan(self, path: str, output: Optional[str] = None, offsets: bool = False) -> Dict:
+        """Valida todas as linhas de ``path``; grava em ``output`` o bitmap (1 = válida, uma
+        linha por bit, em ordem) ou, com ``offsets``, os offsets uint64 das linhas inválidas
+        """
+        rows = valid = 0
+        out = open(output, "wb") if output else None
+        pending_bits = np.zeros(0, dtype=bool)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return {"rows": 0, "valid": 0, "invalid": 0}
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    data = np.frombuffer(mm, dtype=np.uint8)
+                    if self.record_length:
+                        blocks = self._fixed_blocks(data)
+                    else:
+                        blocks = self._delimited_blocks(data, mm)
+                    
+                    for starts, mask in blocks:
+                        rows += len(mask)
+                        valid += int(np.count_nonzero(mask))
+                        if out is None:
+                            continue
+                        if offsets:
+                            starts[~mask].astype("<u8").tofile(out)
+                        else:
+                            # Bits que não fecham um byte ficam para o próximo bloco
+                            bits = np.concatenate((pending_bits, mask))
+                            whole = len(bits) - len(bits) % 8
+                            np.packbits(bits[:whole]).tofile(out)
+                            pending_bits = bits[whole:]
+                finally:
+                    data = blocks = None
+                    try:
+                        mm.close()
+                    except BufferError:
+                        # Após um erro, o traceback ainda pode referenciar views do mapa
+                        pass
+            if out is not None and len(pending_bits):
+                np.packbits(pending_bits).tofile(out)
+        finally:
+            if out is not None:
+                out.close()
+        
+        return {"rows": rows, "valid": valid, "invalid": rows - valid}
 
 
 class PlacaLookup:
@@ -441,8 +3309,10 @@ class PlacaLookup:
         return re.sub(r'[^A-Za-z0-9]', '', placa.upper())
     
     def lookup(self, placa: str) -> Dict:
-        placa = self.clean(placa)
-        
+        return self.lookup_key(self.clean(placa))
+    
+    def lookup_key(self, placa: str) -> Dict:
+        """Interpreta uma placa já limpa (maiúsculas, sem separadores)"""
         # Formato antigo: AAA-1234
         # Formato Mercosul: AAA1A23
         
@@ -462,70 +3332,880 @@ class PlacaLookup:
         }
 
 
+@dataclass
+class Candidate:
+    """Tipo possível de uma consulta, com a chave já limpa para o lookup e a confiança (0 a 1)"""
+    kind: str
+    key: str
+    confidence: float
+    valid: bool = True
+
+
+@dataclass
+class Classification:
+    """Resultado do QueryClassifier: candidatos do mais ao menos provável"""
+    query: str
+    candidates: List[Candidate]
+    
+    @property
+    def kind(self) -> str:
+        return self.candidates[0].kind if self.candidates else "unknown"
+    
+    @property
+    def key(self) -> str:
+        return self.candidates[0].key if self.candidates else self.query
+    
+    @property
+    def valid(self) -> bool:
+        return bool(self.candidates) and self.candidates[0].valid
+
+
+class QueryClassifier:
+    """Classifica consultas em uma passada: chave limpa e tipos candidatos ordenados
+    
+    Os dígitos são extraídos uma única vez e a chave de cada candidato segue para o
+    ``lookup_key`` do módulo, sem nova limpeza. A confiança considera os dígitos
+    verificadores (CPF/CNPJ) e o DDD: 11 dígitos são CPF se os verificadores batem, e
+    celular se não batem e o DDD existe. Um rótulo curto antes do número ("CPF:",
+    "tel") é aceito e, se indicar um dos candidatos, ele passa à frente.
+    """
+    
+    NON_DIGITS = re.compile(r'\D')
+    # Só dígitos e a pontuação usada em documentos, CEPs e telefones
+    NUMERIC = re.compile(r'^\+?[\d\s.\-/()]+$')
+    # Rótulo alfabético curto seguido do número: "CPF: 529...", "tel 1198..."
+    LABEL = re.compile(r'^([^\W\d_]{1,12})\s*[:.#=\-]?\s*(?=[\d+(])')
+    LABELS = {
+        "cpf": "cpf", "cnpj": "cnpj", "cep": "cep",
+        "tel": "phone", "telefone": "phone", "fone": "phone", "cel": "phone", "celular": "phone",
+    }
+    PLACA = re.compile(r'^[A-Z]{3}\d[A-Z\d]\d{2}$')
+    # Placa inteira em um token, com separador opcional após as letras: "ABC-1234", "abc 1d23"
+    PLACA_TOKEN = re.compile(r'^[A-Za-z]{3}[\s\-]?[A-Za-z\d]{4}$')
+    
+    @classmethod
+    def classify(cls, query: str) -> Classification:
+        query = query.strip()
+        digits = cls.NON_DIGITS.sub('', query)
+        if len(digits) == 11:
+            valid = CPFValidator.is_valid(digits)
+        elif len(digits) == 14:
+            valid = CNPJLookup.is_valid(digits)
+        else:
+            valid = False
+        return cls._build(query, digits, valid)
+    
+    @classmethod
+    def classify_batch(cls, queries: Iterable[str]) -> List[Classification]:
+        """Classifica um lote; os dígitos verificadores de CPF/CNPJ vão em lote (com numpy)"""
+        queries = [query.strip() for query in queries]
+        digits = [cls.NON_DIGITS.sub('', query) for query in queries]
+        valid = [False] * len(queries)
+        
+        for width, batch, scalar in ((11, CPFValidator.validate_batch, CPFValidator.is_valid),
+                                     (14, CNPJLookup.validate_batch, CNPJLookup.is_valid)):
+            positions = [i for i, key in enumerate(digits) if len(key) == width]
+            if not positions:
+                continue
+            keys = [digits[i] for i in positions]
+            results = batch(keys)[0].tolist() if np is not None else map(scalar, keys)
+            for i, ok in zip(positions, results):
+                valid[i] = ok
+        
+        return [cls._build(query, key, ok) for query, key, ok in zip(queries, digits, valid)]
+    
+    @classmethod
+    def _build(cls, query: str, digits: str, valid: bool) -> Classification:
+        candidates: List[Candidate] = []
+        size = len(digits)
+        
+        label = cls.LABEL.match(query)
+        number = query[label.end():] if label else query
+        international = number.startswith("+")
+        
+        if "@" in query:
+            email = EmailLookup.normalize(query)
+            # Chave vazia: o EmailLookup responde "Email inválido"
+            candidates.append(Candidate("email", email or "", 0.99 if email else 0.2, email is not None))
+        
+        numeric = bool(digits) and bool(cls.NUMERIC.match(number))
+        if numeric:
+            if size == 14 and not international:
+                candidates.append(Candidate("cnpj", digits, 0.99 if valid else 0.5, valid))
+            if size == 11 and not international:
+                candidates.append(Candidate("cpf", digits, 0.95 if valid else 0.3, valid))
+            if size == 8:
+                candidates.append(Candidate("cep", digits, 0.9))
+            
+            phone = digits[2:] if digits.startswith("55") and size > 11 else digits
+            mobile = len(phone) == 11 and phone[2] == "9"
+            if len(phone) == 10 or mobile:
+                ddd = phone[:2] in PhoneLookup.DDDS
+                confidence = 0.9 if ddd else 0.3
+                # 11 dígitos com verificadores de CPF válidos: provavelmente CPF
+                if size == 11 and not international and valid:
+                    confidence = 0.4 if ddd else 0.1
+                candidates.append(Candidate("phone", phone, confidence, ddd))
+        
+        if cls.PLACA_TOKEN.match(query) and not cls.NUMERIC.match(query):
+            placa = PlacaLookup.clean(query)
+            well_formed = bool(cls.PLACA.match(placa))
+            candidates.append(Candidate("placa", placa, 0.95 if well_formed else 0.3, well_formed))
+        
+        # Entradas majoritariamente numéricas nunca viram domínio ("CPF: 529.982.247-25",
+        # "8.8.8.8"): o TLD precisa ter letras
+        letters = sum(1 for char in query if char.isalpha())
+        if "." in query and "@" not in query and not candidates and not numeric and letters >= size:
+            if query.rstrip(".").rsplit(".", 1)[-1].isalpha():
+                domain = DomainLookup.normalize(query)
+                well_formed = " " not in domain
+                candidates.append(Candidate("domain", domain, 0.9 if well_formed else 0.2, well_formed))
+        
+        labelled = cls.LABELS.get(label.group(1).lower()) if label else None
+        for candidate in candidates:
+            if candidate.kind == labelled:
+                candidate.confidence = 1.0
+        
+        candidates.sort(key=lambda candidate: -candidate.confidence)
+        return Classification(query, candidates)
+
+
+def _offline_shard(path: str, start: int, end: int) -> bytes:
+    """Worker do OfflinePipeline: resolve as linhas de [start, end) e devolve o NDJSON pronto"""
+    phone = PhoneLookup()
+    placa = PlacaLookup()
+    out = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    
+    queries = [line for line in data.decode("utf-8", errors="replace").splitlines() if line.strip()]
+    for classification in QueryClassifier.classify_batch(queries):
+        kind, key, query = classification.kind, classification.key, classification.query
+        if kind == "cpf":
+            row = {"type": kind, "result": CPFValidator.validate_key(key)}
+        elif kind == "cnpj":
+            row = {"type": kind, "result": {"cnpj": key, "valid": classification.valid}}
+        elif kind == "phone":
+            row = {"type": kind, "result": phone.lookup_key(key)}
+        elif kind == "placa":
+            row = {"type": kind, "result": placa.lookup_key(key)}
+        elif kind == "unknown":
+            row = {"type": kind, "error": "Não foi possível identificar o tipo de consulta"}
+        else:
+            # CEP, domínio e email dependem de rede: ficam marcados para o --bulk
+            row = {"type": kind, "network": True}
+        row["query"] = query
+        out.append(json.dumps(row, ensure_ascii=False))
+    
+    return ("\n".join(out) + "\n").encode("utf-8") if out else b""
+
+
+class OfflinePipeline:
+    """Processa em paralelo (processos) as consultas que não dependem de rede
+    
+    O arquivo de entrada (uma consulta por linha) é dividido em fatias de ``shard_size``
+    bytes alinhadas em fim de linha; cada worker lê a própria fatia e devolve o NDJSON já
+    serializado, gravado na ordem da entrada. CPF, telefone e placa são resolvidos; CNPJ
+    recebe só a verificação dos dígitos; CEP, domínio e email saem marcados com ``network``.
+    """
+    
+    SHARD_SIZE = 4 * 1024 * 1024
+    
+    def __init__(self, workers: Optional[int] = None, shard_size: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size or self.SHARD_SIZE
+    
+    def _shards(self, path: str) -> Iterator[Tuple[int, int]]:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            start = 0
+            while start < size:
+                f.seek(min(start + self.shard_size, size))
+                f.readline()
+                end = min(f.tell(), size)
+                yield start, end
+                start = end
+    
+    def run(self, input_path: str, output_path: str) -> Dict:
+        rows = 0
+        with open(output_path, "wb") as output:
+            if self.workers <= 1:
+                for start, end in self._shards(input_path):
+                    data = _offline_shard(input_path, start, end)
+                    rows += data.count(b"\n")
+                    output.write(data)
+                return {"rows": rows, "output": output_path}
+            
+            with ProcessPoolExecutor(self.workers) as executor:
+                pending: deque = deque()
+                # Contrapressão: até duas fatias por worker; a cabeça da fila define a ordem
+                for start, end in self._shards(input_path):
+                    if len(pending) >= self.workers * 2:
+                        data = pending.popleft().result()
+                        rows += data.count(b"\n")
+                        output.write(data)
+                    pending.append(executor.submit(_offline_shard, input_path, start, end))
+                while pending:
+                    data = pending.popleft().result()
+                    rows += data.count(b"\n")
+                    output.write(data)
+        
+        return {"rows": rows, "output": output_path}
+
+
+class BulkJournal:
+    """Diário append-only de um job em massa: registros (offset na entrada, fim da saída)
+    
+    Cada registro de 16 bytes afirma que toda a entrada antes do offset já tem resultado
+    gravado na saída até a posição indicada; o último registro completo é o checkpoint.
+    """
+    
+    RECORD = struct.Struct("<QQ")
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab+")
+        # Registro parcial (queda no meio da escrita) é descartado
+        size = self._file.seek(0, os.SEEK_END)
+        if size % self.RECORD.size:
+            self._file.truncate(size - size % self.RECORD.size)
+    
+    def last(self) -> Tuple[int, int]:
+        """Último checkpoint (offset na entrada, fim da saída); (0, 0) em um job novo"""
+        size = self._file.seek(0, os.SEEK_END)
+        if size < self.RECORD.size:
+            return 0, 0
+        self._file.seek(size - self.RECORD.size)
+        return self.RECORD.unpack(self._file.read(self.RECORD.size))
+    
+    def append(self, input_offset: int, output_end: int):
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(self.RECORD.pack(input_offset, output_end))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def close(self):
+        self._file.close()
+
+
 class OSINTBrasil:
     """Classe principal que integra todos os módulos"""
     
-    def __init__(self):
-        self.cnpj = CNPJLookup()
-        self.cep = CEPLookup()
+    # Tipos resolvidos sem rede e tipos que dependem de provedores externos
+    OFFLINE_TYPES = ("cpf", "phone", "placa", "unknown")
+    NETWORK_TYPES = ("cnpj", "cep", "domain", "email")
+    
+    # Consultas classificadas (e CNPJs validados em lote) por vez no bulk_iter
+    BULK_CHUNK = 1024
+    
+    def __init__(self, max_workers: int = 5, race: bool = False,
+                 hedge_delay: Optional[float] = None, cache_path: Optional[str] = None,
+                 cache_ttls: Optional[Dict[str, Optional[int]]] = None,
+                 memory_entries: int = 10000, memory_bytes: int = 32 * 1024 * 1024,
+                 cnpj_base: Optional[str] = None, socios_index: Optional[str] = None,
+                 rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 record_types: Optional[List[str]] = None, dns_server: Optional[str] = None):
+        # Um único transporte para todos os módulos: conexões reaproveitadas por host,
+        # com cota (balde de tokens) e concorrência adaptativa por provedor
+        self.limiter = RateLimiter(rate_limits, max_concurrency=max_workers)
+        self.http = HTTPTransport(pool_size=max_workers, limiter=self.limiter)
+        
+        self.disk_cache, self.memory_cache = self._build_caches(cache_path, cache_ttls,
+                                                               memory_entries, memory_bytes)
+        self.cache = self.memory_cache if self.memory_cache is not None else self.disk_cache
+        
+        # Consultas idênticas simultâneas (mesmo tipo e chave limpa) viram uma só
+        self.flight = SingleFlight()
+        
+        self.cnpj_base = CNPJBase(cnpj_base) if cnpj_base else None
+        
+        # Índice reverso de sócios: explícito ou o gerado junto com a base offline
+        if socios_index is None and cnpj_base:
+            candidate = os.path.join(cnpj_base, SocioIndex.FILENAME)
+            if os.path.exists(candidate + ".idx"):
+                socios_index = candidate
+        self.socios_index = SocioIndex(socios_index) if socios_index else None
+        self.cnpj = CNPJLookup(self.http, base=self.cnpj_base, race=race, hedge_delay=hedge_delay,
+                               cache=self.cache, flight=self.flight)
+        self.cep = CEPLookup(self.http, race=race, hedge_delay=hedge_delay,
+                             cache=self.cache, flight=self.flight)
         self.phone = PhoneLookup()
-        self.domain = DomainLookup()
-        self.email = EmailLookup()
+        # Cache DNS por (nome, tipo) compartilhado: o MX de um domínio serve a domínio e email
+        # dns_server ("host[:porta]"): protocolo DNS direto em vez de DNS-over-HTTPS
+        self.dns_cache = DNSCache()
+        if dns_server:
+            self.resolver = WireResolver(dns_server, cache=self.dns_cache, limiter=self.limiter)
+        else:
+            self.resolver = DoHResolver(self.http, cache=self.dns_cache)
+        self.domain = DomainLookup(self.http, cache=self.cache, flight=self.flight,
+                                   record_types=record_types, resolver=self.resolver)
+        self.email = EmailLookup(self.http, cache=self.cache, flight=self.flight, resolver=self.resolver)
         self.cpf = CPFValidator()
         self.placa = PlacaLookup()
     
+    @staticmethod
+    def _build_caches(cache_path: Optional[str], cache_ttls: Optional[Dict[str, Optional[int]]],
+                      memory_entries: int, memory_bytes: int) -> Tuple[Optional[ResultCache], Optional[MemoryCache]]:
+        """Cache em camadas: memória (LRU) -> disco (SQLite) -> rede"""
+        disk_cache = ResultCache(cache_path, cache_ttls) if cache_path else None
+        memory_cache = None
+        if memory_entries > 0 and memory_bytes > 0:
+            memory_cache = MemoryCache(memory_entries, memory_bytes, ttls=cache_ttls,
+                                       backend=disk_cache)
+        return disk_cache, memory_cache
+    
+    @staticmethod
+    def detect(query: str) -> str:
+        """Identifica o tipo mais provável da consulta ("unknown" se nenhum se aplica)"""
+        return QueryClassifier.classify(query).kind
+    
+    def _handler(self, kind: str) -> Callable[[str], Any]:
+        """Função que recebe a chave já limpa pelo classificador"""
+        return self.cpf.validate_key if kind == "cpf" else getattr(self, kind).lookup_key
+    
+    def _dispatch(self, kind: str, key: str) -> Dict:
+        if kind == "unknown":
+            return {"type": "unknown", "error": "Não foi possível identificar o tipo de consulta"}
+        return {"type": kind, "result": self._handler(kind)(key)}
+    
     def auto_detect(self, query: str) -> Dict:
         """Detecta automaticamente o tipo de consulta"""
-        query = query.strip()
-        cleaned = re.sub(r'\D', '', query)
+        classification = QueryClassifier.classify(query)
+        return self._dispatch(classification.kind, classification.key)
+    
+    def _bulk_one(self, kind: str, key: str, query: str) -> Dict:
+        try:
+            result = self._dispatch(kind, key)
+            result["query"] = query
+            return result
+        except Exception as e:
+            return {"query": query, "error": str(e)}
+    
+    def _is_offline(self, kind: str) -> bool:
+        """Tipos respondidos só com CPU (ou pela base offline), sem passar pelo pool de rede"""
+        return kind in self.OFFLINE_TYPES or (kind == "cnpj" and self.cnpj_base is not None)
+    
+    def _classify(self, queries: Iterator[str]) -> Iterator[Tuple[str, str, str, Optional[Dict]]]:
+        """Gera (tipo, chave, consulta, resultado pronto); CNPJs inválidos já saem com o erro
         
-        # CNPJ: 14 dígitos
-        if len(cleaned) == 14:
-            return {"type": "cnpj", "result": self.cnpj.lookup(query)}
+        A entrada é lida em blocos de BULK_CHUNK e classificada em lote (dígitos de CPF/CNPJ
+        com validate_batch, se houver numpy) antes de qualquer trabalho de rede.
+        """
+        while True:
+            chunk = list(itertools.islice(queries, self.BULK_CHUNK))
+            if not chunk:
+                return
+            
+            for classification in QueryClassifier.classify_batch(chunk):
+                kind, key, query = classification.kind, classification.key, classification.query
+                ready = None
+                if kind == "cnpj" and not classification.valid:
+                    ready = {"type": "cnpj", "result": {"error": "CNPJ inválido"}, "query": query}
+                yield kind, key, query, ready
+    
+    def bulk_iter(self, queries: Iterable[str], max_workers: int = 5, window: Optional[int] = None,
+                  ordered: bool = False, budgets: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+        """Consulta em massa em fluxo: gera resultados à medida que ficam prontos
         
-        # CPF: 11 dígitos
-        if len(cleaned) == 11 and not query.startswith("+"):
-            return {"type": "cpf", "result": self.cpf.validate(query)}
+        ``queries`` pode ser qualquer iterável (um arquivo aberto, um gerador) e só é
+        consumido conforme há espaço na janela de consultas de rede em andamento
+        (padrão: 4 por worker). Cada consulta é classificada antes: tipos offline (CPF,
+        telefone, placa) são resolvidos na hora, e cada tipo de rede tem o próprio pool,
+        com ``budgets[tipo]`` workers (padrão: ``max_workers``), para que CEPs não fiquem
+        atrás de CNPJs lentos. Com ``ordered``, os resultados saem na ordem de entrada;
+        o buffer de reordenação é limitado pela mesma janela. CNPJs inválidos são
+        descartados em lote antes de chegar ao pool de rede.
+        """
+        budgets = {kind: (budgets or {}).get(kind, max_workers) for kind in self.NETWORK_TYPES}
+        window = max(window or 4 * sum(budgets.values()), max(budgets.values()))
+        self.http.resize(max(budgets.values()))
+        classified = self._classify(iter(queries))
         
-        # CEP: 8 dígitos
-        if len(cleaned) == 8:
-            return {"type": "cep", "result": self.cep.lookup(query)}
+        executors: Dict[str, ThreadPoolExecutor] = {}
+        pending: deque = deque()
+        held = None
+        try:
+            exhausted = False
+            while True:
+                while not exhausted:
+                    # Na ordem, resultados offline também ocupam o buffer de reordenação
+                    if ordered and len(pending) >= window:
+                        break
+                    if held is None:
+                        held = next(classified, None)
+                        if held is None:
+                            exhausted = True
+                            break
+                    
+                    kind, key, query, ready = held
+                    if ready is not None or self._is_offline(kind):
+                        held = None
+                        result = ready if ready is not None else self._bulk_one(kind, key, query)
+                        if not ordered:
+                            yield result
+                            continue
+                        future = Future()
+                        future.set_result(result)
+                        pending.append(future)
+                        continue
+                    
+                    # Consulta de rede sem espaço na janela: fica retida até abrir vaga
+                    if len(pending) >= window:
+                        break
+                    held = None
+                    executor = executors.get(kind)
+                    if executor is None:
+                        executor = executors[kind] = ThreadPoolExecutor(max_workers=budgets[kind])
+                    pending.append(executor.submit(self._bulk_one, kind, key, query))
+                
+                if not pending:
+                    return
+                
+                if ordered:
+                    # A cabeça da fila define a ordem; os já prontos atrás dela esperam no buffer
+                    yield pending.popleft().result()
+                    continue
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+        finally:
+            # Consumidor que para no meio: descarta o que ainda não começou
+            for future in pending:
+                future.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=False)
+    
+    def bulk_lookup(self, queries: Iterable[str], max_workers: int = 5,
+                    budgets: Optional[Dict[str, int]] = None) -> List[Dict]:
+        """Consulta em massa com threading; resultados na ordem de entrada"""
+        return list(self.bulk_iter(queries, max_workers=max_workers, ordered=True, budgets=budgets))
+    
+    def bulk_job(self, input_path: str, output_path: str, journal_path: Optional[str] = None,
+                 max_workers: int = 5, checkpoint_every: int = 100,
+                 budgets: Optional[Dict[str, int]] = None) -> Dict:
+        """Job em massa retomável: uma consulta por linha em ``input_path``, resultados em NDJSON
         
-        # Telefone: 10-11 dígitos
-        if len(cleaned) in [10, 11]:
-            return {"type": "phone", "result": self.phone.lookup(query)}
+        A cada ``checkpoint_every`` resultados a saída é sincronizada em disco e o progresso
+        vai para o diário (padrão: ``output_path + ".journal"``). Ao reiniciar, a saída é
+        truncada no último checkpoint e a leitura continua do offset correspondente; só o
+        trecho após o checkpoint é consultado de novo.
+        """
+        journal = BulkJournal(journal_path or output_path + ".journal")
+        start_offset, output_end = journal.last()
         
-        # Email
-        if "@" in query:
-            return {"type": "email", "result": self.email.lookup(query)}
+        # Offsets de fim de linha das consultas entregues ao bulk_iter, na mesma ordem
+        offsets: deque = deque()
         
-        # Domínio
-        if "." in query and not "@" in query:
-            return {"type": "domain", "result": self.domain.lookup(query)}
+        def lines(source):
+            offset = start_offset
+            for line in source:
+                offset += len(line)
+                query = line.decode("utf-8", errors="replace").strip()
+                if query:
+                    offsets.append(offset)
+                    yield query
         
-        # Placa
-        if len(query.replace("-", "")) == 7:
-            return {"type": "placa", "result": self.placa.lookup(query)}
+        processed = 0
+        with open(input_path, "rb") as source, open(output_path, "ab") as output:
+            output.truncate(output_end)
+            output.seek(output_end)
+            source.seek(start_offset)
+            # (offset concluído na entrada, fim da saída correspondente), atualizados juntos
+            done = (start_offset, output_end)
+            
+            def checkpoint():
+                output.flush()
+                os.fsync(output.fileno())
+                journal.append(*done)
+            
+            try:
+                for result in self.bulk_iter(lines(source), max_workers=max_workers, ordered=True,
+                                             budgets=budgets):
+                    data = json.dumps(result, ensure_ascii=False).encode("utf-8") + b"\n"
+                    output.write(data)
+                    done = (offsets.popleft(), done[1] + len(data))
+                    processed += 1
+                    if processed % checkpoint_every == 0:
+                        checkpoint()
+                
+                # Linhas em branco no fim do arquivo também contam como concluídas
+                done = (source.seek(0, os.SEEK_END), done[1])
+            finally:
+                checkpoint()
+                journal.close()
         
-        return {"type": "unknown", "error": "Não foi possível identificar o tipo de consulta"}
+        return {
+            "input": input_path,
+            "output": output_path,
+            "resumed_at": start_offset,
+            "processed": processed
+        }
     
-    def bulk_lookup(self, queries: List[str], max_workers: int = 5) -> List[Dict]:
-        """Consulta em massa com threading"""
+    def search_socios(self, query: str, limit: int = 50) -> Dict:
+        """Lista as empresas em que um sócio (nome, prefixo ou CPF mascarado) aparece
+        
+        Os candidatos do índice são conferidos só com dados locais (base offline ou cache),
+        sem acessar a rede; os que não estão disponíveis localmente saem com
+        ``"verificado": False``.
+        """
+        if self.socios_index is None:
+            return {"error": "Índice de sócios não disponível"}
+        
         results = []
+        for cnpj in self.socios_index.candidates(query):
+            company = self._cnpj_local(cnpj)
+            if company is None:
+                # Fora da base e do cache: consultar a rede aqui custaria minutos na cota da ReceitaWS
+                results.append({"cnpj": cnpj, "verificado": False})
+                company = {}
+            for socio in company.get("socios") or []:
+                if not isinstance(socio, dict):
+                    continue
+                name, document, qualificacao = SocioIndex.partner_fields(socio)
+                if SocioIndex.matches(query, name, document):
+                    results.append({
+                        "cnpj": cnpj,
+                        "razao_social": company.get("razao_social", ""),
+                        "nome_socio": name,
+                        "documento": document,
+                        "qualificacao": qualificacao,
+                        "verificado": True
+                    })
+            if len(results) >= limit:
+                break
+        
+        return {"query": query, "total": len(results), "resultados": results[:limit]}
+    
+    def health(self) -> Dict:
+        """Saúde dos provedores (circuit breaker, EWMA) e estado das cotas por host"""
+        return {
+            "providers": self.http.health(),
+            "rate_limits": self.limiter.status()
+        }
+    
+    def _cnpj_local(self, cnpj: str) -> Optional[Dict]:
+        """Dados do CNPJ disponíveis sem rede (base offline ou cache), ou None"""
+        if self.cnpj_base is not None:
+            return self.cnpj.lookup_key(cnpj)
+        if self.cache is not None:
+            return self.cache.peek("cnpj", cnpj)
+        return None
+    
+    def _cnpj_is_local(self, cnpj: str) -> bool:
+        """Indica se o CNPJ pode ser respondido sem rede (base offline ou cache)"""
+        if self.cnpj_base is not None:
+            return True
+        return self.cache is not None and self.cache.peek("cnpj", cnpj) is not None
+    
+    def graph_expand(self, cnpj: str, depth: int = 1, max_workers: int = 5,
+                     max_requests: int = 100, max_fanout: int = 50) -> Dict:
+        """Expande a rede societária a partir de um CNPJ (empresas <-> sócios)
+        
+        A cada nível as empresas da fronteira são consultadas em paralelo (até
+        ``max_workers``); o que está no cache ou na base offline não consome o orçamento
+        de ``max_requests`` consultas à rede, cujo ritmo fica com o RateLimiter (a cota de
+        cada provedor, ex.: 3/min na ReceitaWS). Sócios
+        pessoa jurídica são seguidos diretamente; sócios pessoa física, pelo índice
+        reverso de sócios (quando disponível), até ``max_fanout`` empresas por sócio.
+        """
+        root = CNPJLookup.clean(cnpj)
+        if not CNPJLookup.validate(root):
+            return {"error": "CNPJ inválido"}
+        
+        nodes: Dict[str, Dict] = {}
+        edges: List[Dict] = []
+        seen_companies = set()
+        seen_partners = set()
+        requests_made = 0
+        truncated = False
+        
+        # CNPJ -> sócios que precisam constar no QSA (None: sem conferência)
+        frontier: Dict[str, Optional[set]] = {root: None}
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self.auto_detect, q): q for q in queries}
-            
-            for future in as_completed(futures):
-                query = futures[future]
+            for level in range(depth + 1):
+                futures = {}
+                for company, expected in frontier.items():
+                    if company in seen_companies:
+                        continue
+                    local = self._cnpj_is_local(company)
+                    if not local:
+                        if requests_made >= max_requests:
+                            truncated = True
+                            continue
+                        requests_made += 1
+                    seen_companies.add(company)
+                    futures[executor.submit(self.cnpj.lookup_key, company)] = (company, expected)
+                
+                next_frontier: Dict[str, Optional[set]] = {}
+                for future in as_completed(futures):
+                    company, expected = futures[future]
+                    try:
+                        data = future.result()
+                    except Exception:
+                        continue
+                    if "error" in data:
+                        continue
+                    
+                    partners = []
+                    for socio in data.get("socios") or []:
+                        if not isinstance(socio, dict):
+                            continue
+                        name, document, qualificacao = SocioIndex.partner_fields(socio)
+                        doc = SocioIndex.doc_term(document)
+                        if doc and doc.startswith("$"):
+                            partner_id = "cnpj:" + doc[1:]
+                        else:
+                            partner_id = f"socio:{SocioIndex.normalize(name)}|{doc or ''}"
+                        partners.append((partner_id, name, document, qualificacao))
+                    
+                    # Candidatos vindos do índice reverso precisam ter o sócio no QSA
+                    if expected is not None and not expected & {p[0] for p in partners}:
+                        continue
+                    
+                    company_id = "cnpj:" + company
+                    nodes[company_id] = {"id": company_id, "type": "empresa", "cnpj": company,
+                                         "label": data.get("razao_social", "")}
+                    
+                    for partner_id, name, document, qualificacao in partners:
+                        edges.append({"source": partner_id, "target": company_id,
+                                      "qualificacao": qualificacao})
+                        
+                        if partner_id.startswith("cnpj:"):
+                            nodes.setdefault(partner_id, {"id": partner_id, "type": "empresa",
+                                                          "cnpj": partner_id[5:], "label": name})
+                            next_frontier[partner_id[5:]] = None
+                            continue
+                        
+                        nodes.setdefault(partner_id, {"id": partner_id, "type": "pessoa",
+                                                      "label": name, "documento": document})
+                        if level < depth and self.socios_index is not None and partner_id not in seen_partners:
+                            seen_partners.add(partner_id)
+                            candidates = self.socios_index.candidates(name)
+                            for other in itertools.islice(candidates, max_fanout):
+                                if other in next_frontier and next_frontier[other] is None:
+                                    continue
+                                next_frontier.setdefault(other, set()).add(partner_id)
+                
+                frontier = next_frontier
+        
+        return {
+            "root": root,
+            "depth": depth,
+            "nodes": list(nodes.values()),
+            "edges": edges,
+            "requests": requests_made,
+            "truncated": truncated
+        }
+    
+    def close(self):
+        """Fecha as conexões mantidas pelo transporte HTTP, pelo resolvedor DNS e pelo cache"""
+        self.cnpj.close()
+        self.cep.close()
+        self.domain.close()
+        self.http.close()
+        self.resolver.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+        if self.cnpj_base is not None:
+            self.cnpj_base.close()
+        if self.socios_index is not None:
+            self.socios_index.close()
+
+
+class AsyncOSINTBrasil:
+    """Motor asyncio: as mesmas consultas do OSINTBrasil como corrotinas, sobre aiohttp
+    
+    Indicado para lotes grandes: milhares de consultas simultâneas em um único thread,
+    limitadas por ``max_connections`` (total) e ``per_host`` conexões. Cache em camadas,
+    base offline de CNPJ e cotas por host funcionam como no modo síncrono.
+    """
+    
+    def __init__(self, max_connections: int = 1000, per_host: int = 100, race: bool = False,
+                 hedge_delay: Optional[float] = None, cache_path: Optional[str] = None,
+                 cache_ttls: Optional[Dict[str, Optional[int]]] = None,
+                 memory_entries: int = 10000, memory_bytes: int = 32 * 1024 * 1024,
+                 cnpj_base: Optional[str] = None,
+                 rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 record_types: Optional[List[str]] = None, dns_server: Optional[str] = None):
+        self.limiter = RateLimiter(rate_limits, max_concurrency=per_host)
+        self.http = AsyncHTTPTransport(max_connections, per_host, limiter=self.limiter)
+        
+        self.disk_cache, self.memory_cache = OSINTBrasil._build_caches(cache_path, cache_ttls,
+                                                                      memory_entries, memory_bytes)
+        self.cache = self.memory_cache if self.memory_cache is not None else self.disk_cache
+        self.flight = AsyncSingleFlight()
+        
+        self.cnpj_base = CNPJBase(cnpj_base) if cnpj_base else None
+        self.cnpj = AsyncCNPJLookup(self.http, base=self.cnpj_base, race=race, hedge_delay=hedge_delay,
+                                    cache=self.cache, flight=self.flight)
+        self.cep = AsyncCEPLookup(self.http, race=race, hedge_delay=hedge_delay,
+                                  cache=self.cache, flight=self.flight)
+        self.phone = PhoneLookup()
+        self.dns_cache = DNSCache()
+        if dns_server:
+            self.resolver = AsyncWireResolver(dns_server, cache=self.dns_cache, limiter=self.limiter)
+        else:
+            self.resolver = AsyncDoHResolver(self.http, cache=self.dns_cache)
+        self.domain = AsyncDomainLookup(self.http, cache=self.cache, flight=self.flight,
+                                        record_types=record_types, resolver=self.resolver)
+        self.email = AsyncEmailLookup(self.http, cache=self.cache, flight=self.flight,
+                                      resolver=self.resolver)
+        self.cpf = CPFValidator()
+        self.placa = PlacaLookup()
+    
+    async def __aenter__(self) -> "AsyncOSINTBrasil":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    _handler = OSINTBrasil._handler
+    
+    async def auto_detect(self, query: str) -> Dict:
+        """Detecta o tipo de consulta; tipos offline (CPF, telefone, placa) respondem sem await de rede"""
+        classification = QueryClassifier.classify(query)
+        kind = classification.kind
+        
+        if kind == "unknown":
+            return {"type": "unknown", "error": "Não foi possível identificar o tipo de consulta"}
+        
+        result = self._handler(kind)(classification.key)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return {"type": kind, "result": result}
+    
+    async def bulk_lookup(self, queries: List[str], concurrency: int = 1000) -> List[Dict]:
+        """Consulta em massa com até ``concurrency`` consultas em andamento; resultados na ordem de entrada"""
+        queries = list(queries)
+        results: List[Optional[Dict]] = [None] * len(queries)
+        pending = iter(enumerate(queries))
+        
+        # Um número fixo de workers consome a fila: memória constante mesmo com milhões de consultas
+        async def worker():
+            for index, query in pending:
                 try:
-                    result = future.result()
+                    result = await self.auto_detect(query)
                     result["query"] = query
-                    results.append(result)
                 except Exception as e:
-                    results.append({"query": query, "error": str(e)})
+                    result = {"query": query, "error": str(e)}
+                results[index] = result
         
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(queries)))))
         return results
+    
+    async def sweep_domains(self, domains: Iterable[str], window: int = 1000,
+                            stats: Optional[Dict[str, int]] = None) -> AsyncIterator[Dict]:
+        """Varre uma lista grande de domínios, entregando um registro compacto por domínio
+        
+        Cada nome é normalizado (sufixo ``.com.br``) e os repetidos são descartados antes de
+        qualquer consulta; até ``window`` domínios ficam em andamento ao mesmo tempo, dentro
+        da cota do resolvedor no RateLimiter. Os registros saem na ordem em que terminam, e
+        ``stats`` (se informado) acompanha as contagens.
+        """
+        stats = stats if stats is not None else {}
+        stats.update(read=0, duplicates=0, domains=0, online=0, failed=0)
+        lookup = self.domain
+        # Fila limitada: um consumidor lento segura os workers em vez de acumular resultados
+        results: asyncio.Queue = asyncio.Queue(maxsize=window)
+        
+        def unique():
+            seen = set()
+            for raw in domains:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                stats["read"] += 1
+                domain = lookup.normalize(raw)
+                if domain in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(domain)
+                yield domain
+        
+        pending = unique()
+        
+        async def worker():
+            for domain in pending:
+                try:
+                    answers = await asyncio.gather(*(lookup._query_type(domain, rtype)
+                                                     for rtype in lookup.record_types))
+                    record = lookup.sweep_record(domain, answers)
+                except Exception as e:
+                    record = {"domain": domain, "error": str(e)}
+                await results.put(record)
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(window)]
+        
+        async def run():
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                # Erro ao ler a entrada: repassado ao consumidor
+                await results.put(e)
+                return
+            await results.put(None)
+        
+        runner = asyncio.ensure_future(run())
+        try:
+            while True:
+                record = await results.get()
+                if record is None:
+                    break
+                if isinstance(record, Exception):
+                    raise record
+                stats["domains"] += 1
+                if record.get("online"):
+                    stats["online"] += 1
+                if "failed" in record or "error" in record:
+                    stats["failed"] += 1
+                yield record
+        finally:
+            # Consumidor parou antes do fim: nada fica rodando em segundo plano
+            for task in workers:
+                task.cancel()
+            runner.cancel()
+    
+    @staticmethod
+    def _sweep_rate(stats: Dict[str, int], start: float) -> Dict:
+        elapsed = time.monotonic() - start
+        return dict(stats, elapsed=round(elapsed, 2),
+                    domains_per_sec=round(stats["domains"] / elapsed, 1) if elapsed > 0 else None)
+    
+    async def sweep_job(self, input_path: str, output_path: str, window: int = 1000,
+                        progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Varredura de um arquivo (um domínio por linha) para NDJSON compacto; retorna as contagens e domínios/s
+        
+        ``progress``, se informado, recebe as contagens parciais a cada segundo.
+        """
+        stats: Dict[str, int] = {}
+        start = last = time.monotonic()
+        with open(input_path, encoding="utf-8", errors="replace") as source, \
+                open(output_path, "w", encoding="utf-8") as output:
+            async for record in self.sweep_domains(source, window=window, stats=stats):
+                output.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                if progress is not None and time.monotonic() - last >= 1:
+                    last = time.monotonic()
+                    progress(self._sweep_rate(stats, start))
+        
+        return dict(self._sweep_rate(stats, start), input=input_path, output=output_path)
+    
+    def health(self) -> Dict:
+        return {
+            "providers": self.http.health(),
+            "rate_limits": self.limiter.status()
+        }
+    
+    async def close(self):
+        await self.http.close()
+        await self.resolver.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+        if self.cnpj_base is not None:
+            self.cnpj_base.close()
 
 
 def print_result(result: Dict, indent: int = 0):
@@ -548,9 +4228,9 @@ def print_result(result: Dict, indent: int = 0):
             print(f"{prefix}{Colors.CYAN}{key}:{Colors.END} {Colors.GREEN}{value}{Colors.END}")
 
 
-def interactive_mode():
+def interactive_mode(osint: Optional[OSINTBrasil] = None):
     """Modo interativo"""
-    osint = OSINTBrasil()
+    osint = osint or OSINTBrasil()
     
     banner()
     
@@ -562,6 +4242,8 @@ def interactive_mode():
     print(f"  {Colors.CYAN}email <email>{Colors.END}    - Info email")
     print(f"  {Colors.CYAN}domain <domain>{Colors.END}  - Info domínio")
     print(f"  {Colors.CYAN}placa <placa>{Colors.END}    - Info placa")
+    print(f"  {Colors.CYAN}socio <nome>{Colors.END}     - Empresas de um sócio")
+    print(f"  {Colors.CYAN}health{Colors.END}           - Saúde dos provedores")
     print(f"  {Colors.CYAN}auto <query>{Colors.END}     - Detecção automática")
     print(f"  {Colors.CYAN}exit{Colors.END}             - Sair")
     
@@ -576,6 +4258,11 @@ def interactive_mode():
                 print(f"{Colors.WARNING}Até mais!{Colors.END}")
                 break
             
+            if query.lower() == "health":
+                print(f"\n{Colors.HEADER}═══ Saúde dos provedores ═══{Colors.END}\n")
+                print_result(osint.health())
+                continue
+            
             parts = query.split(maxsplit=1)
             cmd = parts[0].lower()
             arg = parts[1] if len(parts) > 1 else ""
@@ -594,6 +4281,8 @@ def interactive_mode():
                 result = osint.domain.lookup(arg)
             elif cmd == "placa" and arg:
                 result = osint.placa.lookup(arg)
+            elif cmd == "socio" and arg:
+                result = osint.search_socios(arg)
             elif cmd == "auto" and arg:
                 result = osint.auto_detect(arg)
             else:
@@ -611,15 +4300,159 @@ def interactive_mode():
 
 
 def main():
-    if len(sys.argv) > 1:
-        # Modo linha de comando
-        osint = OSINTBrasil()
-        query = " ".join(sys.argv[1:])
-        result = osint.auto_detect(query)
+    parser = argparse.ArgumentParser(
+        description="OSINT Brasil - consulta de dados públicos brasileiros"
+    )
+    parser.add_argument("query", nargs="*",
+                        help="Consulta com detecção automática (sem argumentos abre o modo interativo)")
+    parser.add_argument("--cache", metavar="ARQUIVO", nargs="?", const=ResultCache.DEFAULT_PATH,
+                        help=f"Usa cache persistente em SQLite (padrão: {ResultCache.DEFAULT_PATH})")
+    parser.add_argument("--race", action="store_true",
+                        help="Consulta provedores de CNPJ/CEP em corrida com hedge")
+    parser.add_argument("--cnpj-base", metavar="DIR",
+                        help="Responde CNPJ pela base offline (sem rede)")
+    parser.add_argument("--build-cnpj-base", nargs="+", metavar="CAMINHO",
+                        help="Importa os dados abertos do CNPJ: ORIGEM... DESTINO")
+    parser.add_argument("--dns-types", metavar="TIPOS",
+                        help="Registros DNS consultados em domínios, separados por vírgula (padrão: A,MX,NS)")
+    parser.add_argument("--dns-server", metavar="HOST[:PORTA]",
+                        help="Consulta DNS direto (UDP/TCP) neste resolvedor em vez de DNS-over-HTTPS")
+    parser.add_argument("--dns-rate", type=float, metavar="QPS",
+                        help="Limite de consultas por segundo ao resolvedor DNS")
+    parser.add_argument("--socios", metavar="CONSULTA",
+                        help="Lista empresas de um sócio (nome, prefixo ou CPF mascarado)")
+    parser.add_argument("--socios-index", metavar="ARQUIVO",
+                        help="Índice reverso de sócios (padrão: o da --cnpj-base)")
+    parser.add_argument("--build-socios-index", metavar="ARQUIVO",
+                        help="Gera o índice de sócios a partir dos CNPJs no --cache")
+    parser.add_argument("--graph", metavar="CNPJ",
+                        help="Expande a rede societária a partir de um CNPJ")
+    parser.add_argument("--depth", type=int, default=1,
+                        help="Níveis de empresas na expansão do --graph (padrão: 1)")
+    parser.add_argument("--max-requests", type=int, default=100,
+                        help="Orçamento de consultas à rede no --graph (padrão: 100)")
+    parser.add_argument("--bulk", metavar="ENTRADA",
+                        help="Job em massa retomável: uma consulta por linha (requer --output)")
+    parser.add_argument("--output", metavar="SAIDA",
+                        help="Arquivo NDJSON com os resultados do --bulk")
+    parser.add_argument("--journal", metavar="ARQUIVO",
+                        help="Diário de progresso do --bulk (padrão: SAIDA.journal)")
+    parser.add_argument("--workers", type=int,
+                        help="Consultas simultâneas no --bulk (padrão: 5) e no --sweep (padrão: 1000) "
+                             "ou processos no --offline (padrão: CPUs)")
+    parser.add_argument("--sweep", metavar="ENTRADA",
+                        help="Varredura de domínios: um por linha, NDJSON compacto com A/MX/NS (requer --output)")
+    parser.add_argument("--offline", metavar="ENTRADA",
+                        help="Resolve em processos paralelos as consultas sem rede (requer --output)")
+    parser.add_argument("--scan", metavar="ARQUIVO",
+                        help="Valida em lote os CPFs/CNPJs de um arquivo (uma linha por registro)")
+    parser.add_argument("--scan-type", choices=sorted(DocumentScanner.WIDTHS), default="cpf",
+                        help="Documento validado pelo --scan (padrão: cpf)")
+    parser.add_argument("--delimiter", metavar="CHAR",
+                        help="Separador de campos do --scan (padrão: linha inteira)")
+    parser.add_argument("--field", type=int, default=0,
+                        help="Índice do campo com o documento no --scan (padrão: 0)")
+    parser.add_argument("--record-length", type=int, metavar="BYTES",
+                        help="Registros de largura fixa no --scan (bytes por linha, com o \\n)")
+    parser.add_argument("--field-start", type=int, default=0,
+                        help="Posição do documento no registro de largura fixa (padrão: 0)")
+    parser.add_argument("--scan-offsets", action="store_true",
+                        help="Grava no --output os offsets das linhas inválidas em vez do bitmap")
+    parser.add_argument("--import-memory", type=int, default=1024, metavar="MB",
+                        help="Limite aproximado de memória da importação (padrão: 1024)")
+    parser.add_argument("--import-workers", type=int, metavar="N",
+                        help="Processos usados na importação (padrão: número de CPUs)")
+    args = parser.parse_args()
+    
+    if args.build_cnpj_base:
+        if len(args.build_cnpj_base) < 2:
+            parser.error("--build-cnpj-base requer ao menos uma origem e o diretório de destino")
+        *sources, output = args.build_cnpj_base
+        builder = CNPJBaseBuilder(output, memory_limit=args.import_memory * 1024 * 1024,
+                                  workers=args.import_workers)
+        counts = builder.build(sources)
+        print(json.dumps(counts, indent=2, ensure_ascii=False))
+        return
+    
+    if args.build_socios_index:
+        if not args.cache:
+            parser.error("--build-socios-index requer --cache")
+        cache = ResultCache(args.cache)
+        try:
+            count = SocioIndex.build(args.build_socios_index, SocioIndex.partners_from_cache(cache),
+                                     memory_limit=args.import_memory * 1024 * 1024)
+        finally:
+            cache.close()
+        print(json.dumps({"socios_index": count}, indent=2, ensure_ascii=False))
+        return
+    
+    if args.scan:
+        scanner = DocumentScanner(args.scan_type, delimiter=args.delimiter, field=args.field,
+                                  record_length=args.record_length, field_start=args.field_start)
+        counts = scanner.scan(args.scan, args.output, offsets=args.scan_offsets)
+        print(json.dumps(counts, indent=2, ensure_ascii=False))
+        return
+    
+    if args.offline:
+        if not args.output:
+            parser.error("--offline requer --output")
+        counts = OfflinePipeline(args.workers).run(args.offline, args.output)
+        print(json.dumps(counts, indent=2, ensure_ascii=False))
+        return
+    
+    if args.bulk and not args.output:
+        parser.error("--bulk requer --output")
+    
+    record_types = args.dns_types.split(",") if args.dns_types else None
+    
+    if args.sweep:
+        if not args.output:
+            parser.error("--sweep requer --output")
+        if aiohttp is None and not args.dns_server:
+            parser.error("--sweep sem --dns-server consulta via DoH e requer o pacote aiohttp (pip install aiohttp)")
+        
+        def report(stats):
+            print(f"\r{stats['domains']} domínios, {stats['domains_per_sec']}/s", end="", file=sys.stderr)
+        
+        async def sweep():
+            window = args.workers or 1000
+            async with AsyncOSINTBrasil(max_connections=window, cache_path=args.cache,
+                                        record_types=record_types, dns_server=args.dns_server) as osint:
+                if args.dns_rate:
+                    osint.limiter.set_limit(osint.resolver.endpoint, args.dns_rate, args.dns_rate)
+                return await osint.sweep_job(args.sweep, args.output, window=window, progress=report)
+        
+        result = asyncio.run(sweep())
+        print(file=sys.stderr)
         print(json.dumps(result, indent=2, ensure_ascii=False))
-    else:
-        # Modo interativo
-        interactive_mode()
+        return
+    
+    workers = args.workers or 5
+    osint = OSINTBrasil(max_workers=workers, race=args.race, cache_path=args.cache,
+                        cnpj_base=args.cnpj_base, socios_index=args.socios_index,
+                        record_types=record_types, dns_server=args.dns_server)
+    if args.dns_rate:
+        osint.limiter.set_limit(osint.resolver.endpoint, args.dns_rate, args.dns_rate)
+    try:
+        if args.bulk:
+            result = osint.bulk_job(args.bulk, args.output, args.journal, max_workers=workers)
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        elif args.socios:
+            result = osint.search_socios(args.socios)
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        elif args.graph:
+            result = osint.graph_expand(args.graph, depth=args.depth, max_requests=args.max_requests)
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        elif args.query:
+            # Modo linha de comando
+            query = " ".join(args.query)
+            result = osint.auto_detect(query)
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            # Modo interativo
+            interactive_mode(osint)
+    finally:
+        osint.close()
 
 
 if __name__ == "__main__":
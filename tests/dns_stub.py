@@ -0,0 +1,106 @@
+"""Resolvedor DNS de teste (UDP e TCP em localhost) usado pelos testes do DNS e da varredura"""
+
+import socket
+import struct
+import threading
+
+
+def encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.strip(".").split(".")) + b"\x00"
+
+
+def record(rtype, ttl, rdata, owner=b"\xc0\x0c"):
+    # Dono comprimido: ponteiro para o nome da pergunta (offset 12)
+    return owner + struct.pack(">HHIH", rtype, 1, ttl, len(rdata)) + rdata
+
+
+class StubServer:
+    """Resolvedor de teste em UDP e TCP na mesma porta
+    
+    ``nx*`` responde NXDOMAIN com SOA, ``tc*`` vem truncado em UDP (completo em TCP) e
+    ``drop*`` perde o primeiro datagrama.
+    """
+    
+    def __init__(self):
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.bind(("127.0.0.1", 0))
+        self.port = self.udp.getsockname()[1]
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp.bind(("127.0.0.1", self.port))
+        self.tcp.listen(16)
+        self.counts = {"udp": 0, "tcp": 0}
+        self.dropped = set()
+        for target in (self._serve_udp, self._serve_tcp):
+            threading.Thread(target=target, daemon=True).start()
+    
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.port}"
+    
+    def answer(self, query, tcp):
+        qid = struct.unpack(">H", query[:2])[0]
+        pos, labels = 12, []
+        while query[pos]:
+            labels.append(query[pos + 1:pos + 1 + query[pos]].decode())
+            pos += 1 + query[pos]
+        name = ".".join(labels)
+        qtype = struct.unpack(">H", query[pos + 1:pos + 3])[0]
+        question = query[12:pos + 5]
+        
+        if name.startswith("drop") and name not in self.dropped:
+            self.dropped.add(name)
+            return None
+        
+        answers, authority, rcode, truncated = [], [], 0, False
+        if name.startswith("nx"):
+            rcode = 3
+            soa = (encode_name("a.dns.br") + encode_name("hostmaster.registro.br")
+                   + struct.pack(">IIIII", 1, 3600, 600, 604800, 300))
+            authority.append(record(6, 900, soa, owner=encode_name("br")))
+        elif name.startswith("tc") and not tcp:
+            truncated = True
+        elif qtype == 1:
+            answers = [record(1, 120, bytes([1, 2, 3, 4])), record(1, 60, bytes([5, 6, 7, 8]))]
+        elif qtype == 28:
+            answers = [record(28, 120, bytes(15) + b"\x01")]
+        elif qtype == 15:
+            answers = [record(15, 300, struct.pack(">H", 10) + b"\x02mx\xc0\x0c")]
+        elif qtype == 2:
+            answers = [record(2, 300, b"\x03ns1\xc0\x0c")]
+        elif qtype == 16:
+            answers = [record(16, 300, b"\x06v=spf1\x05 ~all")]
+        elif qtype == 257:
+            answers = [record(257, 300, b"\x00\x05issueletsencrypt.org")]
+        
+        flags = 0x8180 | rcode | (0x0200 if truncated else 0)
+        header = struct.pack(">HHHHHH", qid, flags, 1, len(answers), len(authority), 0)
+        return header + question + b"".join(answers) + b"".join(authority)
+    
+    def _serve_udp(self):
+        while True:
+            try:
+                query, client = self.udp.recvfrom(4096)
+            except OSError:
+                return
+            self.counts["udp"] += 1
+            reply = self.answer(query, tcp=False)
+            if reply is not None:
+                self.udp.sendto(reply, client)
+    
+    def _serve_tcp(self):
+        while True:
+            try:
+                conn, _ = self.tcp.accept()
+            except OSError:
+                return
+            self.counts["tcp"] += 1
+            with conn:
+                stream = conn.makefile("rb")
+                length = struct.unpack(">H", stream.read(2))[0]
+                reply = self.answer(stream.read(length), tcp=True)
+                conn.sendall(struct.pack(">H", len(reply)) + reply)
+    
+    def close(self):
+        self.udp.close()
+        self.tcp.close()
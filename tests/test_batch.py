@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from osint_brasil import CNPJLookup, CPFValidator
+
+
+def cpf_for(base):
+    digits = [int(c) for c in base]
+    for weights in (CPFValidator.WEIGHTS_1, CPFValidator.WEIGHTS_2):
+        remainder = sum(d * w for d, w in zip(digits, weights)) % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return "".join(map(str, digits))
+
+
+VALID_CPF = cpf_for("529982247")
+VALID_CNPJ = "11222333000181"
+
+
+def scalar_cpf(codes):
+    return [CPFValidator.is_valid(CPFValidator.clean(str(code))) for code in codes]
+
+
+def scalar_cnpj(codes):
+    return [CNPJLookup.is_valid(CNPJLookup.clean(str(code))) for code in codes]
+
+
+def test_overlong_strings_are_rejected():
+    cpfs = [VALID_CPF, "1" + VALID_CPF, VALID_CPF + "0", VALID_CPF[:-1], "529.982.247-25"]
+    mask, _ = CPFValidator.validate_batch(cpfs)
+    assert mask.tolist() == [True, False, False, False, True]
+    assert mask.tolist() == scalar_cpf(cpfs)
+    
+    cnpjs = [VALID_CNPJ, VALID_CNPJ + "00", "11.222.333/0001-81", VALID_CNPJ[:-1]]
+    mask, check = CNPJLookup.validate_batch(cnpjs)
+    assert mask.tolist() == [True, False, True, False]
+    assert check[1].tolist() == [255, 255]
+
+
+def test_integers_outside_width_are_rejected():
+    mask, _ = CPFValidator.validate_batch(np.array([int(VALID_CPF), 1052998224725, -int(VALID_CPF)]))
+    assert mask.tolist() == [True, False, False]
+    
+    mask, _ = CNPJLookup.validate_batch(np.array([int(VALID_CNPJ), 10 ** 14 + int(VALID_CNPJ)]))
+    assert mask.tolist() == [True, False]
+
+
+def test_bytes_with_mixed_line_lengths():
+    lines = [VALID_CPF, VALID_CPF + "9", VALID_CPF, VALID_CPF[:10], VALID_CPF + "\r"]
+    mask, _ = CPFValidator.validate_batch("\n".join(lines).encode() + b"\n")
+    assert mask.tolist() == [True, False, True, False, True]
+    
+    # Largura fixa sem quebras de linha continua no caminho rápido
+    mask, _ = CPFValidator.validate_batch((VALID_CPF * 3).encode())
+    assert mask.tolist() == [True] * 3
+
+
+def test_batch_matches_scalar_on_random_input():
+    rng = random.Random(7)
+    codes = []
+    for _ in range(2000):
+        length = rng.choice([10, 11, 11, 11, 12, 13])
+        codes.append("".join(rng.choice("0123456789") for _ in range(length)))
+    codes += [cpf_for("".join(rng.choice("0123456789") for _ in range(9))) for _ in range(500)]
+    
+    mask, _ = CPFValidator.validate_batch(codes)
+    assert mask.tolist() == scalar_cpf(codes)
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from osint_brasil import BulkJournal, CPFValidator, OSINTBrasil
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def write_queries(path, count):
+    queries = []
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            if i % 7 == 0:
+                f.write("\n")  # linhas em branco são puladas mas contam no offset
+                continue
+            query = "%011d" % (52998224725 + i)
+            queries.append(query)
+            f.write(query + "\n")
+    return queries
+
+
+def test_bulk_job_resumes_from_journal(tmp_path):
+    source = tmp_path / "consultas.txt"
+    output = tmp_path / "saida.ndjson"
+    queries = write_queries(source, 1000)
+    
+    osint = OSINTBrasil()
+    validate = osint.cpf.validate_key
+    calls = []
+    
+    def interrupting(cpf):
+        calls.append(cpf)
+        if len(calls) == 400:
+            raise Interrupted()
+        return validate(cpf)
+    
+    osint.cpf.validate_key = interrupting
+    try:
+        with pytest.raises(Interrupted):
+            osint.bulk_job(str(source), str(output), max_workers=4, checkpoint_every=50)
+        
+        offset, _ = BulkJournal(str(output) + ".journal").last()
+        assert 0 < offset < source.stat().st_size
+        
+        osint.cpf.validate_key = validate
+        calls.clear()
+        result = osint.bulk_job(str(source), str(output), max_workers=4, checkpoint_every=50)
+        assert result["resumed_at"] == offset
+        assert result["processed"] < len(queries)
+    finally:
+        osint.close()
+    
+    rows = [json.loads(line) for line in open(output, encoding="utf-8")]
+    assert [row["query"] for row in rows] == queries
+    assert all(row["result"] == CPFValidator.validate(row["query"]) for row in rows)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+import pytest
+
+from osint_brasil import AsyncCachedLookup, DomainLookup, EmailLookup, MemoryCache, OSINTBrasil, ResultCache
+
+
+def counting_resolve(lookup):
+    calls = []
+    
+    def resolve(domain):
+        calls.append(domain)
+        return {"domain": domain, "dns": {"A": ["1.2.3.4"]}, "online": True}, 60
+    
+    lookup._resolve = resolve
+    return calls
+
+
+def test_default_config_uses_memory_cache():
+    osint = OSINTBrasil()
+    try:
+        assert isinstance(osint.cache, MemoryCache)
+        assert osint.domain.cache is osint.memory_cache
+        
+        calls = counting_resolve(osint.domain)
+        first = osint.domain.lookup("exemplo.com.br")
+        second = osint.domain.lookup("exemplo.com.br")
+        
+        assert first == second
+        assert calls == ["exemplo.com.br"]
+        assert len(osint.memory_cache) == 1
+    finally:
+        osint.close()
+
+
+def test_disk_cache_sits_behind_memory(tmp_path):
+    osint = OSINTBrasil(cache_path=str(tmp_path / "cache.db"))
+    try:
+        assert osint.cache is osint.memory_cache
+        assert osint.memory_cache.backend is osint.disk_cache
+    finally:
+        osint.close()
+
+
+def test_result_cache_refuses_errors(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.db"))
+    try:
+        cache.set("cnpj", "00000000000191", {"error": "Consulta sem resultado"}, 7 * 86400)
+        assert cache.get("cnpj", "00000000000191") is None
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("memory_entries", [0, 10000])
+def test_async_lookup_does_not_cache_errors(tmp_path, memory_entries):
+    disk, memory = OSINTBrasil._build_caches(str(tmp_path / "cache.db"), None, memory_entries, 1 << 20)
+    
+    class Lookup(AsyncCachedLookup):
+        cache = memory if memory is not None else disk
+        calls = 0
+        
+        async def load(self):
+            Lookup.calls += 1
+            return {"error": "Consulta sem resultado"}, 7 * 86400
+    
+    lookup = Lookup()
+    try:
+        for _ in range(2):
+            result = asyncio.run(lookup._cached("cnpj", "00000000000191", lookup.load))
+            assert "error" in result
+        assert Lookup.calls == 2
+        assert disk.get("cnpj", "00000000000191") is None
+    finally:
+        disk.close()
+
+
+class FlakyResolver:
+    """MX falha na primeira consulta e responde nas seguintes"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def query(self, name, rtype):
+        self.calls.append(rtype)
+        if rtype == "MX" and self.calls.count("MX") == 1:
+            return None
+        data = {"A": "1.2.3.4", "MX": "10 mx.exemplo.com.br.", "NS": "ns1.exemplo.com.br."}[rtype]
+        return {"Status": 0, "Answer": [{"name": name, "type": 1, "TTL": 300, "data": data}]}
+    
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("ttls", [None, {"domain": 3600}])
+def test_partial_dns_result_is_not_cached(ttls):
+    cache = MemoryCache(ttls=ttls)
+    resolver = FlakyResolver()
+    lookup = DomainLookup(cache=cache, resolver=resolver)
+    
+    first = lookup.lookup("exemplo.com.br")
+    assert first["failed"] == ["MX"]
+    assert "MX" not in first["dns"]
+    assert len(cache) == 0
+    
+    second = lookup.lookup("exemplo.com.br")
+    assert "failed" not in second
+    assert second["dns"]["MX"] == ["10 mx.exemplo.com.br."]
+    assert len(cache) == 1
+
+
+def test_failed_mx_email_is_not_cached():
+    cache = MemoryCache(ttls={"email": 3600})
+    lookup = EmailLookup(cache=cache, resolver=FlakyResolver())
+    
+    first = lookup.lookup("fulano@exemplo.com.br")
+    assert first["domain_has_mx"] is None and first["failed"] == ["MX"]
+    assert lookup.lookup("fulano@exemplo.com.br")["domain_has_mx"] is True
+
+
+def test_memory_tier_keeps_disk_expiry(tmp_path):
+    disk = ResultCache(str(tmp_path / "cache.db"), ttls={"cnpj": 7 * 86400})
+    try:
+        # Gravada com 7 dias e envelhecida até faltar 1 s no disco
+        disk.set("cnpj", "00000000000191", {"cnpj": "00000000000191"})
+        conn = disk._conn()
+        conn.execute("UPDATE results SET expires = ?", (time.time() + 1,))
+        conn.commit()
+        
+        memory = MemoryCache(ttls={"cnpj": 7 * 86400}, stale_for=0, backend=disk)
+        loads = []
+        
+        def loader():
+            loads.append(1)
+            return {"cnpj": "00000000000191", "fresh": True}, None
+        
+        assert memory.get_or_load("cnpj", "00000000000191", loader) == {"cnpj": "00000000000191"}
+        assert memory._entries[("cnpj", "00000000000191")][2] <= time.time() + 1
+        
+        time.sleep(1.1)
+        assert memory.get("cnpj", "00000000000191") is None
+        assert memory.get_or_load("cnpj", "00000000000191", loader)["fresh"] is True
+        assert loads == [1]
+    finally:
+        disk.close()
+
+
+def test_memory_tier_keeps_dns_ttl_from_disk(tmp_path):
+    disk = ResultCache(str(tmp_path / "cache.db"))
+    try:
+        disk.set("domain", "exemplo.com.br", {"domain": "exemplo.com.br"}, 5)
+        memory = MemoryCache(backend=disk)
+        
+        assert memory.get("domain", "exemplo.com.br") is not None
+        fresh_until = memory._entries[("domain", "exemplo.com.br")][2]
+        assert fresh_until <= time.time() + 5
+    finally:
+        disk.close()
@@ -0,0 +1,73 @@
+import pytest
+
+import osint_brasil
+from osint_brasil import OSINTBrasil, QueryClassifier
+
+
+@pytest.mark.parametrize("query, kind, key", [
+    ("00.000.000/0001-91", "cnpj", "00000000000191"),
+    ("CNPJ 00000000000191", "cnpj", "00000000000191"),
+    ("529.982.247-25", "cpf", "52998224725"),
+    ("CPF: 529.982.247-25", "cpf", "52998224725"),
+    ("01001-000", "cep", "01001000"),
+    ("cep 01001-000", "cep", "01001000"),
+    ("(11) 3333-4444", "phone", "1133334444"),
+    ("tel 11987654321", "phone", "11987654321"),
+    ("+55 11 98765-4321", "phone", "11987654321"),
+    ("Fulano@Exemplo.com.br", "email", "fulano@exemplo.com.br"),
+    ("exemplo.com.br", "domain", "exemplo.com.br"),
+    ("ABC-1234", "placa", "ABC1234"),
+    ("abc1d23", "placa", "ABC1D23"),
+])
+def test_classify(query, kind, key):
+    classification = QueryClassifier.classify(query)
+    assert (classification.kind, classification.key) == (kind, key)
+
+
+@pytest.mark.parametrize("query", ["rua x 123", "8.8.8.8", "123.456", "cpf: 529.982.247-25.x"])
+def test_mostly_digits_and_free_text_are_unknown(query):
+    classification = QueryClassifier.classify(query)
+    assert classification.kind == "unknown"
+    assert all(candidate.kind != "domain" for candidate in classification.candidates)
+
+
+def test_eleven_digits_split_between_cpf_and_phone():
+    # Verificadores de CPF válidos: CPF na frente, celular como alternativa
+    cpf = QueryClassifier.classify("52998224725")
+    assert [c.kind for c in cpf.candidates] == ["cpf", "phone"]
+    assert cpf.valid
+    
+    # Verificadores inválidos e DDD existente: celular
+    phone = QueryClassifier.classify("11987654321")
+    assert [c.kind for c in phone.candidates] == ["phone", "cpf"]
+    assert not phone.candidates[1].valid
+    
+    # O rótulo decide mesmo com verificadores de CPF válidos
+    labelled = QueryClassifier.classify("tel 52998224725")
+    assert labelled.kind == "phone"
+    # Com "+" é sempre telefone
+    assert [c.kind for c in QueryClassifier.classify("+5511987654321").candidates] == ["phone"]
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_classify_batch_matches_classify(monkeypatch, with_numpy):
+    if with_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(osint_brasil, "np", None)
+    
+    queries = ["52998224725", "52998224726", "00000000000191", "00000000000192", "CPF 529.982.247-25",
+               "11987654321", "01001000", "exemplo.com.br", "rua x 123", " ABC1234 ", ""]
+    batch = QueryClassifier.classify_batch(queries)
+    assert batch == [QueryClassifier.classify(query) for query in queries]
+
+
+def test_labelled_cpf_never_reaches_the_network(monkeypatch):
+    osint = OSINTBrasil()
+    try:
+        monkeypatch.setattr(osint.domain, "lookup_key", pytest.fail)
+        result = osint.auto_detect("CPF: 529.982.247-25")
+        assert result["type"] == "cpf"
+        assert result["result"]["valid"] is True
+    finally:
+        osint.close()
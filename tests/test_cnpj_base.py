@@ -0,0 +1,98 @@
+import pytest
+
+from osint_brasil import CNPJBase, CNPJBaseBuilder, CNPJLookup, OSINTBrasil, ResultCache, SocioIndex
+
+
+def write_empresas(directory, count):
+    path = directory / "K3241.K03200Y0.D30513.EMPRECSV"
+    with open(path, "w", encoding="latin-1", newline="") as f:
+        for i in range(count):
+            # Razão social com quebra de linha e aspas escapadas dentro do campo
+            f.write(f'"{i:08d}";"EMPRESA ""{i}""\nLINHA DOIS";"2062";"49";"1000,00";"05";""\n')
+    return path
+
+
+def test_chunks_never_split_quoted_newlines(tmp_path):
+    source = tmp_path / "rf"
+    source.mkdir()
+    write_empresas(source, 200)
+    
+    builder = CNPJBaseBuilder(str(tmp_path / "base"), workers=1)
+    builder.chunk_size = 1000
+    counts = builder.build([str(source)])
+    assert counts["empresas"] == 200
+    
+    base = CNPJBase(str(tmp_path / "base"))
+    try:
+        assert len(base.tables["empresas"]) == 200
+    finally:
+        base.close()
+
+
+def test_record_end_skips_newlines_inside_quotes():
+    data = b'"1";"a\nb"\n"2";"c\n'
+    assert CNPJBaseBuilder._record_end(data) == len(b'"1";"a\nb"\n')
+    assert CNPJBaseBuilder._record_end(b'"1";"a\nb') == 0
+
+
+def cnpj(basico, ordem):
+    return basico + ordem + CNPJLookup.check_digits(basico + ordem)
+
+
+def test_partners_point_to_actual_head_office(tmp_path):
+    source = tmp_path / "rf"
+    source.mkdir()
+    # 11222333: só a filial é /0001, a matriz é /0003; 44555666: matriz /0005, sem /0001
+    establishments = [("11222333", "0001", "2"), ("11222333", "0003", "1"), ("44555666", "0005", "1")]
+    with open(source / "K3241.K03200Y0.D30513.ESTABELE", "w", encoding="latin-1") as f:
+        for basico, ordem, identificador in establishments:
+            full = cnpj(basico, ordem)
+            f.write(f'"{basico}";"{ordem}";"{full[12:]}";"{identificador}";"FANTASIA";"02"\n')
+    with open(source / "K3241.K03200Y0.D30513.SOCIOCSV", "w", encoding="latin-1") as f:
+        f.write('"11222333";"2";"JOAO DA SILVA";"***123456**";"49";"20200101"\n')
+        f.write('"44555666";"2";"MARIA SOUZA";"***654321**";"49";"20200101"\n')
+    CNPJBaseBuilder(str(tmp_path / "base"), workers=1).build([str(source)])
+    
+    base = CNPJBase(str(tmp_path / "base"))
+    try:
+        assert base.matriz("11222333") == cnpj("11222333", "0003")
+        assert base.matriz("99999999") is None
+        assert list(SocioIndex.partners_from_base(base)) == [
+            (cnpj("11222333", "0003"), "JOAO DA SILVA", "***123456**"),
+            (cnpj("44555666", "0005"), "MARIA SOUZA", "***654321**"),
+        ]
+    finally:
+        base.close()
+
+
+def test_search_socios_never_goes_to_the_network(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "cache.db")
+    first, second = cnpj("11222333", "0001"), cnpj("44555666", "0001")
+    disk = ResultCache(cache_path)
+    for company in (first, second):
+        disk.set("cnpj", company, {
+            "cnpj": company,
+            "razao_social": f"EMPRESA {company}",
+            "socios": [{"nome": "JOAO DA SILVA", "qual": "Sócio-Administrador"}],
+        })
+    SocioIndex.build(str(tmp_path / "socios"), SocioIndex.partners_from_cache(disk))
+    
+    # A entrada do segundo CNPJ expira depois de o índice ter sido montado
+    conn = disk._conn()
+    conn.execute("UPDATE results SET expires = 0 WHERE key = ?", (second,))
+    conn.commit()
+    disk.close()
+    
+    osint = OSINTBrasil(cache_path=cache_path, socios_index=str(tmp_path / "socios.idx"))
+    try:
+        monkeypatch.setattr(osint.cnpj, "lookup_key", pytest.fail)
+        monkeypatch.setattr(osint.cnpj, "lookup", pytest.fail)
+        result = osint.search_socios("joao silva")
+    finally:
+        osint.close()
+    
+    assert result["total"] == 2
+    verified, unverified = result["resultados"]
+    assert verified["cnpj"] == first and verified["verificado"] is True
+    assert verified["nome_socio"] == "JOAO DA SILVA"
+    assert unverified == {"cnpj": second, "verificado": False}
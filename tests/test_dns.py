@@ -0,0 +1,182 @@
+import asyncio
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dns_stub import StubServer, encode_name
+from osint_brasil import AsyncWireResolver, DNSCache, DNSWire, DomainLookup, EmailLookup, HTTPTransport, WireResolver
+
+
+@pytest.fixture
+def resolver(server):
+    wire = WireResolver(server.address, timeout=0.5, retries=2)
+    yield wire
+    wire.close()
+
+
+def test_question_encoding():
+    question = DNSWire.question("exemplo.com.br.", "mx")
+    assert question == encode_name("exemplo.com.br") + struct.pack(">HH", 15, 1)
+    assert DNSWire.question("exemplo.com.br", "TYPE65").endswith(struct.pack(">HH", 65, 1))
+    
+    for name, rtype in (("a" * 64 + ".br", "A"), ("a..br", "A"), ("exemplo.br", "NOPE")):
+        with pytest.raises(ValueError):
+            DNSWire.question(name, rtype)
+    
+    query = DNSWire.query(0x1234, question)
+    assert struct.unpack(">HHHHHH", query[:12]) == (0x1234, 0x0100, 1, 0, 0, 1)
+
+
+def test_decode_rejects_malformed_messages():
+    server = StubServer()
+    try:
+        reply = server.answer(DNSWire.query(1, DNSWire.question("exemplo.com.br", "MX")), tcp=False)
+    finally:
+        server.close()
+    assert DNSWire.decode(reply)["Answer"][0]["data"] == "10 mx.exemplo.com.br."
+    
+    with pytest.raises(ValueError):
+        DNSWire.decode(reply[:-3])
+    # Ponteiro de compressão apontando para si mesmo
+    looped = reply[:12] + b"\xc0\x0c" + reply[-4:]
+    with pytest.raises(ValueError):
+        DNSWire.decode(looped)
+
+
+def test_record_types_are_decoded(resolver):
+    expected = {
+        "A": ["1.2.3.4", "5.6.7.8"],
+        "AAAA": ["::1"],
+        "MX": ["10 mx.exemplo.com.br."],
+        "NS": ["ns1.exemplo.com.br."],
+        "TXT": ["v=spf1 ~all"],
+        "CAA": ['0 issue "letsencrypt.org"'],
+    }
+    for rtype, values in expected.items():
+        data = resolver.query("exemplo.com.br", rtype)
+        assert data["Status"] == 0
+        assert data["Question"] == [{"name": "exemplo.com.br.", "type": DNSWire.TYPES[rtype]}]
+        assert [r["data"] for r in data["Answer"]] == values
+        assert all(r["name"] == "exemplo.com.br." for r in data["Answer"])
+
+
+def test_nxdomain_carries_soa_for_negative_caching(resolver):
+    data = resolver.query("nxfoo.com.br", "A")
+    assert data["Status"] == 3
+    assert "Answer" not in data
+    assert data["Authority"][0]["data"] == "a.dns.br. hostmaster.registro.br. 1 3600 600 604800 300"
+    assert DNSCache.ttl(data) == 300
+
+
+def test_truncated_answer_falls_back_to_tcp(server, resolver):
+    data = resolver.query("tcfoo.com.br", "A")
+    assert not data["TC"]
+    assert [r["data"] for r in data["Answer"]] == ["1.2.3.4", "5.6.7.8"]
+    assert server.counts["tcp"] == 1
+
+
+def test_lost_datagram_is_retried(server, resolver):
+    data = resolver.query("dropfoo.com.br", "A")
+    assert data["Answer"][0]["data"] == "1.2.3.4"
+    assert server.counts["udp"] == 2
+
+
+def test_concurrent_queries_share_one_socket(resolver):
+    names = [f"d{i}.com.br" for i in range(300)]
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        answers = list(executor.map(lambda name: resolver.query(name, "MX"), names))
+    
+    # Cada resposta casada com a própria pergunta pelo ID
+    assert [a["Answer"][0]["data"] for a in answers] == [f"10 mx.{name}." for name in names]
+    assert resolver._pending == {}
+
+
+def test_unreachable_resolver_returns_none():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    
+    wire = WireResolver(f"127.0.0.1:{port}", timeout=0.1, retries=1)
+    try:
+        assert wire.query("exemplo.com.br", "A") is None
+    finally:
+        wire.close()
+
+
+def test_parse_address():
+    assert WireResolver.parse_address("1.1.1.1") == ("1.1.1.1", 53)
+    assert WireResolver.parse_address("127.0.0.1:5353") == ("127.0.0.1", 5353)
+    assert WireResolver.parse_address("[::1]:5353") == ("::1", 5353)
+    assert WireResolver.parse_address("::1") == ("::1", 53)
+    assert WireResolver("[::1]:5353").endpoint == "[::1]:5353"
+
+
+def test_lookups_use_wire_resolver_and_dns_cache(server):
+    cache = DNSCache()
+    wire = WireResolver(server.address, cache=cache, timeout=0.5)
+    try:
+        domain = DomainLookup(resolver=wire)
+        email = EmailLookup(resolver=wire)
+        
+        result = domain.lookup("exemplo.com.br")
+        assert result["online"] is True
+        assert result["dns"]["MX"] == ["10 mx.exemplo.com.br."]
+        sent = server.counts["udp"]
+        
+        # MX já está no cache DNS: o email não gera consulta nova
+        assert email.lookup("fulano@exemplo.com.br")["mail_servers"] == ["10 mx.exemplo.com.br."]
+        assert server.counts["udp"] == sent
+    finally:
+        wire.close()
+
+
+def test_async_wire_resolver(server):
+    async def run():
+        wire = AsyncWireResolver(server.address, timeout=0.5)
+        try:
+            names = [f"e{i}.com.br" for i in range(300)]
+            answers = await asyncio.gather(*(wire.query(name, "A") for name in names))
+            truncated = await wire.query("tcbar.com.br", "MX")
+            negative = await wire.query("nxbar.com.br", "A")
+        finally:
+            await wire.close()
+        return answers, truncated, negative
+    
+    answers, truncated, negative = asyncio.run(run())
+    assert all(a["Answer"][0]["data"] == "1.2.3.4" for a in answers)
+    assert [a["Question"][0]["name"] for a in answers] == [f"e{i}.com.br." for i in range(300)]
+    assert truncated["Answer"][0]["data"] == "10 mx.tcbar.com.br."
+    assert server.counts["tcp"] == 1
+    assert negative["Status"] == 3
+
+
+class StaticResolver:
+    def query(self, name, rtype):
+        return {"Status": 0, "Answer": [{"name": name, "type": 1, "TTL": 60, "data": "1.2.3.4"}]}
+
+
+def test_domain_lookup_reuses_one_executor():
+    http = HTTPTransport(pool_size=2)
+    lookup = DomainLookup(http=http, resolver=StaticResolver())
+    try:
+        before = threading.active_count()
+        for i in range(100):
+            assert lookup.lookup(f"d{i}.com.br")["online"] is True
+        executor = lookup._executor
+        assert lookup.lookup("outro.com.br")["online"] is True
+        assert lookup._executor is executor
+        # Todos os tipos em voo cabem no pool keep-alive do host
+        assert http.pool_size >= len(lookup.record_types)
+        assert threading.active_count() - before <= len(lookup.record_types)
+        
+        # O bulk aumenta o pool de conexões: o pool de tipos acompanha
+        http.resize(20)
+        lookup.lookup("maior.com.br")
+        assert lookup._executor is not executor and lookup._executor_size == 20
+    finally:
+        lookup.close()
+    assert lookup._executor is None
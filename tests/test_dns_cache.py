@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from osint_brasil import DNSCache, DoHResolver
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("osint_brasil.time.time", lambda: now[0])
+    return now
+
+
+def answer(ttl, data="1.2.3.4"):
+    return {"Status": 0, "Answer": [{"name": "exemplo.com.br.", "type": 1, "TTL": ttl, "data": data}]}
+
+
+def negative(status, soa_ttl=900, minimum=300):
+    soa = f"a.dns.br. hostmaster.registro.br. 1 3600 600 604800 {minimum}"
+    return {"Status": status, "Authority": [{"name": "br.", "type": 6, "TTL": soa_ttl, "data": soa}]}
+
+
+def test_answer_expires_with_its_ttl_and_ages(clock):
+    cache = DNSCache()
+    cache.set("Exemplo.com.br.", "A", answer(60))
+    
+    clock[0] += 45
+    data = cache.get("exemplo.com.br", "A")
+    assert data["Answer"][0]["TTL"] == 15
+    
+    clock[0] += 15
+    assert cache.get("exemplo.com.br", "A") is None
+    assert len(cache) == 0
+
+
+def test_negative_answers_use_soa_minimum(clock):
+    cache = DNSCache()
+    assert DNSCache.ttl(negative(3)) == 300
+    assert DNSCache.ttl(negative(3, soa_ttl=120)) == 120
+    # NODATA: nome existe, tipo não; mesma regra
+    assert DNSCache.ttl(negative(0, minimum=60)) == 60
+    assert DNSCache.ttl({"Status": 3}) == DNSCache.NEGATIVE_TTL
+    
+    cache.set("nada.com.br", "A", negative(3))
+    clock[0] += 299
+    assert cache.get("nada.com.br", "A")["Status"] == 3
+    clock[0] += 1
+    assert cache.get("nada.com.br", "A") is None
+
+
+@pytest.mark.parametrize("data", [{"Status": 2}, {"Status": 5}, answer(0), {"Status": 0, "Answer": [{"data": "x"}]}])
+def test_failures_and_zero_ttl_are_not_cached(data):
+    cache = DNSCache()
+    cache.set("exemplo.com.br", "A", data)
+    assert cache.get("exemplo.com.br", "A") is None
+
+
+def test_bounded_lru():
+    cache = DNSCache(max_entries=2)
+    for name in ("a.com.br", "b.com.br"):
+        cache.set(name, "A", answer(60))
+    cache.get("a.com.br", "A")
+    cache.set("c.com.br", "A", answer(60))
+    assert cache.get("b.com.br", "A") is None
+    assert cache.get("a.com.br", "A") is not None and cache.get("c.com.br", "A") is not None
+
+
+class SlowHTTP:
+    def __init__(self):
+        self.urls = []
+    
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        time.sleep(0.05)
+        return Response(answer(60))
+
+
+class Response:
+    status_code = 200
+    
+    def __init__(self, data):
+        self.data = data
+    
+    def json(self):
+        return self.data
+
+
+def test_doh_resolver_shares_requests_and_cache():
+    http = SlowHTTP()
+    resolver = DoHResolver(http, cache=DNSCache())
+    results = []
+    
+    threads = [threading.Thread(target=lambda: results.append(resolver.query("exemplo.com.br", "MX")))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(http.urls) == 1
+    assert http.urls[0] == "https://dns.google/resolve?name=exemplo.com.br&type=MX"
+    assert all(result["Answer"][0]["data"] == "1.2.3.4" for result in results)
+    
+    resolver.query("exemplo.com.br", "MX")
+    resolver.query("exemplo.com.br", "A")
+    assert len(http.urls) == 2
+    assert resolver.endpoint == "dns.google"
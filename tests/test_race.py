@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from osint_brasil import HTTPTransport, ProviderLookup
+
+
+class Lookup(ProviderLookup):
+    APIS = ["http://a.test/{key}", "http://b.test/{key}", "http://c.test/{key}"]
+    PARAM = "key"
+    
+    def __init__(self, delays, **kwargs):
+        super().__init__(HTTPTransport(pool_size=2), race=True, **kwargs)
+        self.delays = delays
+        self.calls = []
+        self._calls_lock = threading.Lock()
+    
+    def _providers(self):
+        return list(self.APIS)
+    
+    def _fetch(self, api, key):
+        with self._calls_lock:
+            self.calls.append(api)
+        time.sleep(self.delays[api])
+        return {"api": api}
+
+
+def test_race_reuses_one_executor():
+    lookup = Lookup({api: 0 for api in Lookup.APIS}, hedge_delay=1)
+    try:
+        before = threading.active_count()
+        for _ in range(50):
+            assert lookup._query("x") == {"api": Lookup.APIS[0]}
+        executor = lookup._executor
+        assert lookup._query("y") is not None
+        assert lookup._executor is executor
+        assert threading.active_count() - before <= len(Lookup.APIS) * 2
+    finally:
+        lookup.close()
+
+
+def test_queued_hedges_are_not_sent_after_winner():
+    delays = {Lookup.APIS[0]: 0.2, Lookup.APIS[1]: 0, Lookup.APIS[2]: 0}
+    lookup = Lookup(delays, hedge_delay=0.01)
+    # Um único worker: os hedges ficam na fila atrás do primeiro provedor
+    lookup._executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        assert lookup._query("x") == {"api": Lookup.APIS[0]}
+        time.sleep(0.1)
+        assert lookup.calls == [Lookup.APIS[0]]
+    finally:
+        lookup.close()
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from osint_brasil import CNPJLookup, CPFValidator, DocumentScanner  # noqa: E402
+
+
+def random_cpf(rng):
+    base = "".join(rng.choice("0123456789") for _ in range(9))
+    for _ in range(2):
+        weights = range(len(base) + 1, 1, -1)
+        digit = sum(int(d) * w for d, w in zip(base, weights)) * 10 % 11
+        base += str(digit % 10)
+    return base
+
+
+def random_cnpj(rng):
+    base = "".join(rng.choice("0123456789") for _ in range(12))
+    return base + CNPJLookup.check_digits(base)
+
+
+def mutate(code, rng):
+    """Metade dos documentos com um dígito trocado (verificador quebrado)"""
+    if rng.random() < 0.5:
+        return code
+    i = rng.randrange(len(code))
+    return code[:i] + str((int(code[i]) + 1) % 10) + code[i + 1:]
+
+
+def line_starts(data):
+    starts, position = [], 0
+    for line in data.split(b"\n"):
+        if position < len(data):
+            starts.append(position)
+        position += len(line) + 1
+    return starts
+
+
+def read_bitmap(path, rows):
+    return np.unpackbits(np.fromfile(path, dtype=np.uint8))[:rows].astype(bool).tolist()
+
+
+@pytest.mark.parametrize("block", [DocumentScanner.BLOCK, 64])
+def test_delimited_quoted_crlf(tmp_path, block):
+    rng = random.Random(18)
+    lines, expected = [], []
+    for i in range(500):
+        cpf = mutate(random_cpf(rng), rng)
+        shape = i % 5
+        if shape == 0:
+            field = cpf
+        elif shape == 1:
+            field = f'"{cpf}"'
+        elif shape == 2:
+            field = cpf[:3] + "." + cpf[3:6] + "." + cpf[6:9] + "-" + cpf[9:]  # formatado: inválido
+        elif shape == 3:
+            field = cpf[:-1]  # curto demais
+        else:
+            lines.append(f"{i};NOME {i}".encode())  # sem o campo
+            expected.append(False)
+            continue
+        lines.append(f"{i};NOME {i};{field}".encode())
+        expected.append(shape in (0, 1) and CPFValidator.is_valid(cpf))
+    
+    # CRLF e última linha sem quebra
+    data = b"\r\n".join(lines)
+    source = tmp_path / "clientes.csv"
+    source.write_bytes(data)
+    
+    scanner = DocumentScanner("cpf", delimiter=";", field=2)
+    scanner.BLOCK = block
+    counts = scanner.scan(str(source), str(tmp_path / "validos.bits"))
+    
+    assert counts == {"rows": 500, "valid": sum(expected), "invalid": 500 - sum(expected)}
+    assert read_bitmap(tmp_path / "validos.bits", 500) == expected
+    
+    scanner.scan(str(source), str(tmp_path / "invalidos.off"), offsets=True)
+    invalid = np.fromfile(tmp_path / "invalidos.off", dtype="<u8").tolist()
+    starts = line_starts(data)
+    assert invalid == [start for start, ok in zip(starts, expected) if not ok]
+
+
+def test_first_field_without_delimiter(tmp_path):
+    rng = random.Random(1)
+    cpfs = [mutate(random_cpf(rng), rng) for _ in range(300)]
+    source = tmp_path / "cpfs.txt"
+    source.write_bytes(b"\n".join(c.encode() for c in cpfs) + b"\n")
+    
+    counts = DocumentScanner("cpf").scan(str(source), str(tmp_path / "validos.bits"))
+    expected = [CPFValidator.is_valid(c) for c in cpfs]
+    assert counts["rows"] == 300 and counts["valid"] == sum(expected)
+    assert read_bitmap(tmp_path / "validos.bits", 300) == expected
+
+
+def test_fixed_width_cnpj(tmp_path):
+    rng = random.Random(2)
+    record_length, field_start = 40, 10
+    cnpjs = [mutate(random_cnpj(rng), rng) for _ in range(257)]
+    records = [
+        (f"{i:010d}" + cnpj).ljust(record_length - 1).encode() + b"\n"
+        for i, cnpj in enumerate(cnpjs)
+    ]
+    source = tmp_path / "cadastro.txt"
+    source.write_bytes(b"".join(records))
+    
+    scanner = DocumentScanner("cnpj", record_length=record_length, field_start=field_start)
+    counts = scanner.scan(str(source), str(tmp_path / "invalidos.off"), offsets=True)
+    expected = [CNPJLookup.is_valid(c) for c in cnpjs]
+    
+    assert counts == {"rows": 257, "valid": sum(expected), "invalid": 257 - sum(expected)}
+    invalid = np.fromfile(tmp_path / "invalidos.off", dtype="<u8").tolist()
+    assert invalid == [i * record_length for i, ok in enumerate(expected) if not ok]
+    
+    scanner.scan(str(source), str(tmp_path / "validos.bits"))
+    # 257 linhas: o último byte do bitmap tem um só bit útil
+    assert (tmp_path / "validos.bits").stat().st_size == 33
+    assert read_bitmap(tmp_path / "validos.bits", 257) == expected
+
+
+def test_empty_file_and_unknown_kind(tmp_path):
+    source = tmp_path / "vazio.txt"
+    source.write_bytes(b"")
+    assert DocumentScanner("cpf").scan(str(source)) == {"rows": 0, "valid": 0, "invalid": 0}
+    with pytest.raises(ValueError):
+        DocumentScanner("rg")
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+import osint_brasil
+from osint_brasil import AsyncOSINTBrasil, AsyncWireResolver
+
+
+def test_sweep_with_dns_server_does_not_need_aiohttp(server, monkeypatch):
+    monkeypatch.setattr(osint_brasil, "aiohttp", None)
+    
+    async def run():
+        async with AsyncOSINTBrasil(dns_server=server.address) as osint:
+            records = [record async for record in osint.sweep_domains(["exemplo.com.br", "nxfoo.com.br"])]
+            # Só quem usa HTTP esbarra na falta do aiohttp, e com o erro explícito
+            with pytest.raises(ImportError):
+                await osint.http.get_json("https://brasilapi.com.br/api/cep/v1/01001000")
+            return records
+    
+    records = sorted(asyncio.run(run()), key=lambda record: record["domain"])
+    assert records[0]["domain"] == "exemplo.com.br" and records[0]["online"] is True
+    assert records[1] == {"domain": "nxfoo.com.br", "online": False, "nxdomain": True}
+
+
+def run_sweep_job(server, tmp_path, lines, window=8, resolver=None):
+    source = tmp_path / "zona.txt"
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    output = tmp_path / "zona.ndjson"
+    
+    async def run():
+        async with AsyncOSINTBrasil(dns_server=server.address, record_types=["A", "MX"]) as osint:
+            if resolver is not None:
+                osint.domain.resolver = resolver
+            return await osint.sweep_job(str(source), str(output), window=window)
+    
+    result = asyncio.run(run())
+    return result, output
+
+
+def test_sweep_job_dedups_and_writes_compact_ndjson(server, tmp_path):
+    names = [f"d{i}.com.br" for i in range(50)]
+    # Repetidos (com outra grafia ou sem sufixo), linhas em branco, NXDOMAIN e resposta truncada
+    lines = names + ["D1.COM.BR", "  d2.com.br  ", "d3", "", "nxfoo.com.br", "tcfoo.com.br"]
+    result, output = run_sweep_job(server, tmp_path, lines)
+    
+    assert result["read"] == 55
+    assert result["duplicates"] == 3
+    assert result["domains"] == 52
+    assert result["online"] == 51
+    assert result["failed"] == 0
+    assert result["domains_per_sec"] > 0
+    
+    raw = output.read_text(encoding="utf-8").splitlines()
+    assert all(": " not in line and ", " not in line for line in raw)
+    records = {record["domain"]: record for record in map(json.loads, raw)}
+    assert len(raw) == 52
+    assert sorted(records) == sorted(names + ["nxfoo.com.br", "tcfoo.com.br"])
+    assert records["d7.com.br"] == {"domain": "d7.com.br", "online": True, "A": ["1.2.3.4", "5.6.7.8"],
+                                    "MX": ["10 mx.d7.com.br."]}
+    assert records["nxfoo.com.br"] == {"domain": "nxfoo.com.br", "online": False, "nxdomain": True}
+    assert records["tcfoo.com.br"]["MX"] == ["10 mx.tcfoo.com.br."]
+
+
+def test_sweep_job_marks_failed_lookups(server, tmp_path):
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    dead = f"127.0.0.1:{probe.getsockname()[1]}"
+    probe.close()
+    
+    resolver = AsyncWireResolver(dead, timeout=0.05, retries=1)
+    result, output = run_sweep_job(server, tmp_path, ["a.com.br", "b.com.br"], resolver=resolver)
+    
+    assert result["domains"] == 2 and result["failed"] == 2 and result["online"] == 0
+    for record in map(json.loads, output.read_text(encoding="utf-8").splitlines()):
+        assert record["failed"] == ["A", "MX"]
+
+
+def test_stopping_early_leaves_nothing_running(server):
+    async def run():
+        async with AsyncOSINTBrasil(dns_server=server.address) as osint:
+            domains = (f"d{i}.com.br" for i in range(10000))
+            seen = []
+            async for record in osint.sweep_domains(domains, window=16):
+                seen.append(record)
+                if len(seen) == 5:
+                    break
+            await asyncio.sleep(0.05)
+            others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            return seen, others
+    
+    seen, others = asyncio.run(run())
+    assert len(seen) == 5
+    assert all(task.done() for task in others)
@@ -0,0 +1,50 @@
+import pytest
+
+from osint_brasil import HTTPTransport, ProviderHealth, RateLimiter, RateLimitExceeded
+
+
+def half_open_transport(url):
+    limiter = RateLimiter({"provedor.test": (0.001, 1)})
+    limiter.reserve("provedor.test")  # esgota a rajada
+    transport = HTTPTransport(limiter=limiter)
+    health = transport.health_for(url)
+    health.state = ProviderHealth.OPEN
+    health.opened_at = 0.0
+    return transport, health
+
+
+def test_rate_limited_probe_does_not_close_circuit():
+    url = "http://provedor.test/recurso"
+    transport, health = half_open_transport(url)
+    
+    with pytest.raises(RateLimitExceeded):
+        transport.get(url, rate_wait=0)
+    
+    assert health.state == ProviderHealth.HALF_OPEN
+    assert health.requests == 0
+    # A vaga de sonda volta: a próxima chamada pode fazer a sonda de verdade
+    assert health.allow()
+    assert not health.allow()
+
+
+def test_release_probe_ignores_closed_circuit():
+    health = ProviderHealth()
+    health.release_probe()
+    assert health.state == ProviderHealth.CLOSED
+
+
+def test_retry_after_on_unlimited_host_only_pauses(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("osint_brasil.time.monotonic", lambda: clock[0])
+    limiter = RateLimiter()
+    
+    limiter.throttle("livre.test", 429, retry_after=60)
+    assert limiter.reserve("livre.test") == pytest.approx(60)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("livre.test", max_wait=1)
+    assert limiter.status()["livre.test"]["in_flight"] == 0
+    
+    # Depois do Retry-After o host volta a não ter limite de taxa
+    clock[0] += 61
+    assert [limiter.reserve("livre.test") for _ in range(100)] == [0.0] * 100
+    assert limiter.status()["livre.test"]["rate"] is None